@@ -0,0 +1,84 @@
+"""
+BotView construction benchmark.
+
+Builds the view every bot receives each step, the way the engines do (PlayerState.bot_view),
+and compares it with the previous per-step snapshot (a fresh view plus four stat objects).
+Reports memory blocks allocated per view (views are kept alive while counting, so every
+allocation shows up) and the time per view, then the steps/s of a headless free-for-all.
+
+  python -m benchmarks.botview
+  python -m benchmarks.botview --players 64 --steps 200
+"""
+
+import argparse, sys, time
+
+from game.model import PlayerState
+from game.context import MatchContext
+from game_multi.headless import FfaMatch
+
+
+class _Snapshot:
+    # Stat copy as BotView used to build it: four of these per bot per step
+    def __init__(self, a, b, c, d, e):
+        self.workers = a; self.soldiers = b; self.houses = c; self.defenses = d; self.attack_pct = e
+
+
+class _SnapshotView:
+    __slots__ = ("step", "me", "opp", "economy", "costs")
+    def __init__(self, step, me, opp):
+        econ = me.ctx.econ
+        self.step = step
+        self.me = _Snapshot(me.workers, me.soldiers, me.houses, me.defenses, me.attack_pct)
+        self.opp = _Snapshot(opp.workers, opp.soldiers, opp.houses, opp.defenses, opp.attack_pct)
+        self.economy = _Snapshot(econ["BASE_WORKERS_PER_STEP"], econ["HOUSE_WORKER_BONUS"], 0, 0, 0.0)
+        self.costs = _Snapshot(econ["HOUSE_COST"], econ["DEFENSE_COST"], 0, 0, 0.0)
+
+
+def measure(build, n):
+    """(blocks allocated per call, microseconds per call) for build(step)."""
+    keep = [None] * n   # preallocated, so only build() allocates while counting
+    build(0)            # warm up lazily created objects
+    before = sys.getallocatedblocks()
+    for step in range(n):
+        keep[step] = build(step)
+    blocks = sys.getallocatedblocks() - before
+    del keep
+    t = time.perf_counter()
+    for step in range(n):
+        build(step)
+    return blocks / n, (time.perf_counter() - t) / n * 1e6
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--views", type=int, default=100_000, help="views to build per variant (default 100000)")
+    ap.add_argument("--players", type=int, default=16, help="players in the headless match (default 16)")
+    ap.add_argument("--steps", type=int, default=200, help="steps of the headless match (default 200)")
+    args = ap.parse_args(argv)
+
+    ctx = MatchContext(seed=0)
+    me, opp = PlayerState("me", "L", ctx), PlayerState("opp", "R", ctx)
+    rows = [
+        ("snapshot (previous)", lambda step: _SnapshotView(step, me, opp)),
+        ("bot_view (in place)", lambda step: me.bot_view(step, opp)),
+    ]
+    print(f"{'view':<22} {'blocks/view':>12} {'us/view':>9}")
+    for name, build in rows:
+        blocks, us = measure(build, args.views)
+        print(f"{name:<22} {blocks:12.2f} {us:9.3f}")
+
+    import game.bots as ww_bots
+    roster = [ww_bots.greedy_rush, ww_bots.boom_econ, ww_bots.turtle_defense, ww_bots.adaptive_match, ww_bots.king_bot]
+    match = FfaMatch([roster[i % len(roster)] for i in range(args.players)], seed=0)
+    t = time.perf_counter()
+    steps = 0
+    while steps < args.steps and not match.done():
+        match.step()
+        steps += 1
+    dt = time.perf_counter() - t
+    print(f"headless {args.players} players: {steps} steps in {dt:.3f}s ({steps / max(dt, 1e-9):.0f} steps/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
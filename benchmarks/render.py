@@ -0,0 +1,147 @@
+"""
+Workers & War render benchmark with synthetic populations.
+
+Builds two PlayerStates directly (no match is played) with the given numbers of workers,
+soldiers, houses and towers per side and a volley of attackers that is always in flight, then
+draws N frames under the SDL dummy driver: field, both bases, the attack and the HUD, the same
+calls the game loops make each frame (the attack is drawn through AttackAnimation, which is
+what animate_attack runs per frame). Prints per-phase frame time percentiles per scene.
+
+  python -m benchmarks.render                             # 100, 1k and 10k workers per side
+  python -m benchmarks.render --workers 5000 --soldiers 2000 --attackers 1000 --frames 600
+  python -m benchmarks.render --renderer full --json render.json
+"""
+
+import argparse, json, sys
+
+from game.record import use_headless
+
+
+def build_scene(ctx, workers, soldiers, houses, towers):
+    """Two players with the given populations, workers already spread over their roam area."""
+    from game.config import HEIGHT
+    from game.model import PlayerState
+    rng = ctx.rng
+    players = []
+    for name, side in (("left", "L"), ("right", "R")):
+        p = PlayerState(name, side, ctx)
+        p.workers, p.soldiers, p.houses = workers, soldiers, houses
+        left, right = p._side_bounds()
+        top, bottom = int(HEIGHT * 0.10), HEIGHT - int(HEIGHT * 0.10)
+        p._worker_positions = [(rng.uniform(left + 10, right - 10), rng.uniform(top, bottom)) for _ in range(workers)]
+        p._worker_vels = [(0.0, 0.0)] * workers
+        p.add_soldiers(soldiers)
+        p.add_houses(houses)
+        p.add_defenses(towers)
+        p.defenses = len(p._defense_positions)
+        players.append(p)
+    return players
+
+
+def build_volley(p1, p2, attackers, now):
+    """AttackAnimation with `attackers` units per side crossing the field, aimed at the other side's workers."""
+    from game.anim import spawn_attack_units, AttackAnimation
+    units = []
+    for me, opp in ((p1, p2), (p2, p1)):
+        starts = me._soldier_positions or [(me.base_x, me.base_y)]
+        starts = [starts[i % len(starts)] for i in range(attackers)]
+        targets = opp._worker_positions or [(opp.base_x, opp.base_y)]
+        targets = [targets[i % len(targets)] for i in range(attackers)]
+        units += spawn_attack_units(me, attackers, opp, both_attacking=False, starts=starts, target_points=targets)
+    return AttackAnimation(units, now)
+
+
+def run_scene(workers, soldiers, houses, towers, attackers, frames, renderer="dirty", seed=0, warmup=10):
+    """Draw `frames` frames of one scene after `warmup` untimed ones (field layer, sprite and text
+    caches); returns {phase: {p50, p90, p99, max}} in ms."""
+    import pygame
+    from game.config import WIDTH, HEIGHT, FPS
+    from game.context import MatchContext
+    from game.perf import FrameProfiler, percentile
+    from game.render import DirtyRenderer
+    from game.text import clear_text_cache
+    from game.view import draw_field, draw_base, draw_hud
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    ctx = MatchContext(seed=seed)
+    clock = ctx.clock
+    p1, p2 = build_scene(ctx, workers, soldiers, houses, towers)
+    volley = build_volley(p1, p2, attackers, clock.now()) if attackers else None
+    dirty = DirtyRenderer(screen) if renderer == "dirty" else None
+    prof = FrameProfiler(frames)
+    dt = 1.0 / FPS
+
+    for frame_nr in range(warmup + frames):
+        if frame_nr == warmup:
+            prof.reset()
+        now = clock.now()
+        with prof.phase("field"):
+            if dirty is not None:
+                frame = dirty.begin()
+            else:
+                frame = screen
+                draw_field(frame)
+        with prof.phase("bases"):
+            draw_base(frame, p1, dt)
+            draw_base(frame, p2, dt)
+        if volley is not None:
+            with prof.phase("attack"):
+                if volley.done(now):
+                    # Relaunch so a volley is always in flight
+                    volley.start, volley.landed = now, False
+                volley.update(now)
+                volley.draw(frame, now)
+        with prof.phase("hud"):
+            draw_hud(frame, p1, p2, "ATTACK" if volley else "PLAN", 1.0, frame_nr)
+        with prof.phase("flip"):
+            if dirty is not None:
+                dirty.present()
+            else:
+                pygame.display.flip()
+        clock.tick(FPS)
+        prof.end_frame()
+
+    pygame.quit()
+    clear_text_cache()
+    rows = {"frame": list(prof.totals)}
+    rows.update((name, list(buf)) for name, buf in prof.history.items())
+    return {name: {"p50": percentile(v, 50), "p90": percentile(v, 90), "p99": percentile(v, 99), "max": max(v, default=0.0)}
+            for name, v in rows.items()}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, nargs="+", default=[100, 1000, 10000], help="workers per side; one scene per value")
+    ap.add_argument("--soldiers", type=int, default=200, help="garrison soldiers per side (default 200)")
+    ap.add_argument("--houses", type=int, default=20, help="houses per side (default 20)")
+    ap.add_argument("--towers", type=int, default=10, help="towers per side (default 10)")
+    ap.add_argument("--attackers", type=int, default=100, help="attack units in flight per side (default 100, 0 = none)")
+    ap.add_argument("--frames", type=int, default=300, help="frames per scene (default 300)")
+    ap.add_argument("--renderer", choices=["dirty", "full"], default="dirty",
+                    help="dirty: DirtyRenderer as in the game loops; full: draw_field + flip every frame")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    args = ap.parse_args(argv)
+
+    use_headless()
+    results = []
+    for workers in args.workers:
+        scene = {"workers": workers, "soldiers": args.soldiers, "houses": args.houses, "towers": args.towers,
+                 "attackers": args.attackers, "frames": args.frames, "renderer": args.renderer}
+        phases = run_scene(workers, args.soldiers, args.houses, args.towers, args.attackers, args.frames,
+                           args.renderer, args.seed)
+        results.append({**scene, "phases": phases})
+        print(f"\n{workers} workers, {args.soldiers} soldiers, {args.houses} houses, {args.towers} towers, "
+              f"{args.attackers} attackers per side ({args.frames} frames, {args.renderer})")
+        print(f"  {'phase':<7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  ms")
+        for name, q in phases.items():
+            print(f"  {name:<7} {q['p50']:8.2f} {q['p90']:8.2f} {q['p99']:8.2f} {q['max']:8.2f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
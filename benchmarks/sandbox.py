@@ -0,0 +1,51 @@
+"""
+Sandboxed bot call overhead.
+
+Calls the same bots in-process and through game.sandbox worker processes (view packed into
+shared memory, action back over a pipe) and prints the time per call of each.
+
+  python -m benchmarks.sandbox
+  python -m benchmarks.sandbox --calls 50000
+"""
+
+import argparse, sys, time
+
+import tron.main as tron
+import game.bots as ww_bots
+from game.context import MatchContext
+from game.model import PlayerState, BOT_VIEW_CODEC
+from game.sandbox import BotPool
+
+
+def per_call(bot, view, n):
+    bot(view)
+    t = time.perf_counter()
+    for _ in range(n):
+        bot(view)
+    return (time.perf_counter() - t) / n * 1e6
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=20_000, help="calls per bot (default 20000)")
+    args = ap.parse_args(argv)
+
+    pos, heading = tron.evenly_spaced_starts(4)[0]
+    others = [(p, True) for p, _ in tron.evenly_spaced_starts(4)]
+    tron_view = tron.BotState(0, pos, heading, 4, others, tron.compute_sensors(heading, pos, {}))
+    ctx = MatchContext(seed=0)
+    ww_view = PlayerState("me", "L", ctx).bot_view(1, PlayerState("opp", "R", ctx))
+
+    cases = [("tron", tron.right_hand_rule, tron_view, tron.STATE_CODEC),
+             ("ww", ww_bots.adaptive_match, ww_view, BOT_VIEW_CODEC)]
+    print(f"{'bot':<24} {'in-process us':>14} {'sandboxed us':>13}")
+    for game, fn, view, codec in cases:
+        with BotPool([fn], codec) as pool:
+            direct = per_call(fn, view, args.calls)
+            boxed = per_call(pool.bots[0], view, args.calls)
+        print(f"{game + ':' + fn.__name__:<24} {direct:14.2f} {boxed:13.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Cold-start import budget for the headless entry points.
+
+Imports each module in a fresh interpreter under `python -X importtime` and reports the time
+the import itself took (cumulative, interpreter startup and site excluded), best of --repeat
+runs, plus the heaviest modules it pulled in. Tournament, sweep and benchmark workers start
+this way, so the rendering stack stays out: a module that imports pygame or asyncio (loaded
+on the first async bot only, game.botcall) is flagged IMPORTS, one over --budget is flagged
+SLOWER, and either makes the exit status 1.
+
+  python -m benchmarks.startup                       # default modules, 50 ms budget
+  python -m benchmarks.startup game.model tournament --budget 30 --repeat 9
+"""
+
+import argparse, os, subprocess, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["game.model", "game.combat", "game.replay", "game.bots", "game_multi.headless", "tournament"]
+FORBIDDEN = ("pygame", "asyncio")
+BUDGET_MS = 50.0
+
+
+def import_times(module):
+    """{name: (self_us, cumulative_us, depth)} for one cold `import module`."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    # Children are listed before their parent: the lines since the previous top-level import
+    # are the module's own
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cum, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (int(own), int(cum), depth)
+        if depth == 0:
+            if name.strip() == module:
+                return times
+            times = {}
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def measure(module, repeat):
+    """(best cumulative ms, that run's import times)."""
+    best = None
+    for _ in range(repeat):
+        times = import_times(module)
+        if best is None or times[module][1] < best[module][1]:
+            best = times
+    return best[module][1] / 1000, best
+
+
+def forbidden(times):
+    """The FORBIDDEN top-level packages among imported module names."""
+    return sorted({name.split(".")[0] for name in times} & set(FORBIDDEN))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("modules", nargs="*", default=MODULES, help=f"modules to import (default: {' '.join(MODULES)})")
+    ap.add_argument("--budget", type=float, default=BUDGET_MS, help=f"allowed cold import time per module in ms (default {BUDGET_MS:g})")
+    ap.add_argument("--repeat", type=int, default=5, help="runs per module, fastest kept (default 5)")
+    ap.add_argument("--top", type=int, default=3, help="heaviest imported modules to list (default 3)")
+    args = ap.parse_args(argv)
+
+    flagged = 0
+    print(f"{'module':<22} {'ms':>8}  heaviest imports (cumulative ms)")
+    for module in args.modules:
+        ms, times = measure(module, max(1, args.repeat))
+        flags = []
+        if ms > args.budget:
+            flags.append("SLOWER")
+        bad = forbidden(times)
+        if bad:
+            flags.append(f"IMPORTS {','.join(bad)}")
+        flagged += bool(flags)
+        # Direct imports only, so a package and its submodules aren't counted twice
+        heavy = sorted((t[1], name) for name, t in times.items() if t[2] == 1)[::-1][:args.top]
+        listed = ", ".join(f"{name} {us / 1000:.1f}" for us, name in heavy)
+        print(f"{module:<22} {ms:8.1f}  {listed}  {' '.join(flags)}")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
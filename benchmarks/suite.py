@@ -0,0 +1,194 @@
+"""
+Engine benchmark suite.
+
+Runs each scenario in a fresh process and reports its throughput, retained memory and peak RSS:
+
+  tron        headless TRON matches (tron/main.py BOTS roster) over grid sizes and player counts
+  ww-text     ww_headless.run_text_sim (greedy_rush mirror, output discarded) over match lengths
+  ww-core     the headless Workers & War step (game_multi/headless.py, game/bots.py roster)
+              over player counts and match lengths
+
+Workers & War pairings are chosen so matches run to the step limit.
+
+Columns: units (ticks or steps played), rate (units/s), retained/unit (memory blocks still
+allocated per unit when the run ends, i.e. what the engine keeps growing; blocks allocated and
+freed within the run don't show up here, benchmarks/botview.py counts those for bot views) and
+peak RSS.
+
+  python -m benchmarks.suite                          # full matrix, table on stdout
+  python -m benchmarks.suite --quick --only ww-core
+  python -m benchmarks.suite --json out.json          # also write the results as JSON
+  python -m benchmarks.suite --update-baseline        # store results as the baseline
+  python -m benchmarks.suite --compare                # flag slowdowns against the baseline (exit 1)
+
+Rates below the baseline by more than --tolerance (default 10%) are flagged SLOWER; peak RSS
+above it by more than the tolerance is flagged MEMORY.
+"""
+
+import argparse, functools, gc, json, os, platform, resource, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import multiprocessing as mp
+
+import ww_headless
+import game.bots as ww_bots
+from game_multi.headless import FfaMatch
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _counted(fn, calls, k):
+    @functools.wraps(fn)
+    def bot(state):
+        calls[k] += 1
+        return fn(state)
+    return bot
+
+
+def tron_match(grid, players, seed=0):
+    """Ticks of one headless TRON match on a grid x grid board."""
+    import tron.main as tron  # here, not at the top: tron imports pygame, the ww scenarios don't need it
+    tron.GRID_W = tron.GRID_H = grid
+    calls = [0] * players
+    bots = [_counted(tron.BOTS[i % len(tron.BOTS)], calls, i) for i in range(players)]
+    tron.run_match(bots, headless=True, seed=seed)
+    # The last bot standing was asked every tick
+    return max(calls)
+
+
+def ww_text(steps, seed=0):
+    """Steps of one ww_headless.run_text_sim match."""
+    calls = [0]
+    bot_l = _counted(ww_headless.greedy_rush, calls, 0)
+    with open(os.devnull, "w") as sink, redirect_stdout(sink):
+        ww_headless.run_text_sim(bot_l, ww_headless.greedy_rush, steps=steps, seed=seed)
+    return calls[0]
+
+
+def ww_core(players, steps, seed=0):
+    """Steps of one headless Workers & War free-for-all."""
+    # king_bot first: a king_bot/greedy_rush 1v1 lasts; larger fields always do
+    roster = [ww_bots.king_bot, ww_bots.greedy_rush, ww_bots.boom_econ, ww_bots.turtle_defense, ww_bots.adaptive_match]
+    m = FfaMatch([roster[i % len(roster)] for i in range(players)], seed=seed)
+    m.run(steps)
+    return m.step_nr - 1
+
+
+def scenarios(quick=False):
+    """[(name, group, unit, fn, kwargs)] in run order."""
+    out = []
+    for grid in ((25, 49) if quick else (25, 49, 99)):
+        for players in ((2, 4) if quick else (2, 4, 8)):
+            out.append((f"tron/grid{grid}/p{players}", "tron", "ticks", tron_match, {"grid": grid, "players": players}))
+    for steps in ((100,) if quick else (100, 500)):
+        out.append((f"ww-text/s{steps}", "ww-text", "steps", ww_text, {"steps": steps}))
+    for players in ((2, 8) if quick else (2, 8, 64)):
+        for steps in ((100,) if quick else (100, 300)):
+            out.append((f"ww-core/p{players}/s{steps}", "ww-core", "steps", ww_core, {"players": players, "steps": steps}))
+    return out
+
+
+def measure(fn, kwargs):
+    """Run one scenario in this process: {units, seconds, rate, retained_blocks_per_unit, peak_rss_mb}."""
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    t = time.perf_counter()
+    units = fn(**kwargs)
+    seconds = time.perf_counter() - t
+    grown = sys.getallocatedblocks() - blocks
+    units = max(1, units)
+    return {
+        "units": units,
+        "seconds": round(seconds, 4),
+        "rate": round(units / max(seconds, 1e-9), 1),
+        "retained_blocks_per_unit": round(grown / units, 2),
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+    }
+
+
+def run_suite(selected, repeat=1):
+    """{name: result} with the best rate of `repeat` runs, each scenario in a fresh process."""
+    results = {}
+    # spawn: a fresh interpreter per run, so peak RSS belongs to that scenario alone
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn"), max_tasks_per_child=1) as pool:
+        for name, group, unit, fn, kwargs in selected:
+            runs = [pool.submit(measure, fn, kwargs).result() for _ in range(repeat)]
+            best = max(runs, key=lambda r: r["rate"])
+            results[name] = {"group": group, "unit": unit, **kwargs, **best}
+            print(f"{name:<22} {best['units']:>7} {unit:<5} {best['rate']:>11.1f}/s {best['retained_blocks_per_unit']:>13.2f} "
+                  f"{best['peak_rss_mb']:>8.1f}", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print results against the baseline; returns the number of flagged scenarios."""
+    flagged = 0
+    print(f"\n{'scenario':<22} {'base/s':>11} {'now/s':>11} {'change':>8} {'base MB':>8} {'now MB':>8}")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            print(f"{name:<22} {'(new)':>11} {r['rate']:>11.1f}")
+            continue
+        change = r["rate"] / max(b["rate"], 1e-9) - 1.0
+        flags = []
+        if change < -tolerance:
+            flags.append("SLOWER")
+        if r["peak_rss_mb"] > b["peak_rss_mb"] * (1.0 + tolerance):
+            flags.append("MEMORY")
+        flagged += bool(flags)
+        print(f"{name:<22} {b['rate']:>11.1f} {r['rate']:>11.1f} {change:>+8.1%} {b['peak_rss_mb']:>8.1f} "
+              f"{r['peak_rss_mb']:>8.1f}  {' '.join(flags)}")
+    return flagged
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--only", nargs="*", metavar="GROUP", help="scenario groups or names to run (tron, ww-text, ww-core, ...)")
+    ap.add_argument("--quick", action="store_true", help="smaller matrix")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per scenario, best rate kept (default 1)")
+    ap.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    ap.add_argument("--baseline", default=BASELINE, metavar="PATH", help="baseline file (default benchmarks/baseline.json)")
+    ap.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    ap.add_argument("--compare", action="store_true", help="compare against the baseline; exit 1 on flagged scenarios")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown/growth (default 0.10)")
+    args = ap.parse_args(argv)
+
+    selected = [s for s in scenarios(args.quick)
+                if not args.only or s[1] in args.only or s[0] in args.only]
+    if not selected:
+        ap.error("no scenario matches --only")
+
+    print(f"{'scenario':<22} {'units':>13} {'rate':>13} {'retained/unit':>13} {'peak MB':>8}")
+    results = run_suite(selected, max(1, args.repeat))
+    doc = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "machine": platform.machine(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(doc, f, indent=2)
+    status = 0
+    if args.compare:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[bench] no usable baseline at {args.baseline}: {e}", file=sys.stderr)
+            return 2
+        status = 1 if compare(results, baseline, args.tolerance) else 0
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            # Keep baseline entries for scenarios that were not run this time
+            with open(args.baseline) as f:
+                old = json.load(f).get("results", {})
+            doc["results"] = {**old, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(doc, f, indent=2)
+        print(f"[bench] baseline written to {args.baseline}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
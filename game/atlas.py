@@ -0,0 +1,179 @@
+import hashlib, io, json, os
+import pygame
+from .cache import cache_dir, atomic_write
+from .config import WINDOW_SCALE, WORKER_SIZE, SOLDIER_SIZE, HOUSE_SIZE, TOWER_SIZE, GRASS_SIZE, TREE_SIZE, BOULDER_SIZE
+
+# Every sprite the views draw, packed into one texture per WINDOW_SCALE and sprite-size config:
+# each PNG smoothscaled to its configured height, the mirrored R-side copies of the unit sprites
+# and the spawn scale-in frames of towers and houses (draw_base grows them from 0.9 to 1.0).
+# The packed image and its index are cached on disk (cache_dir("atlas")), so a new process does
+# one image load instead of loading, scaling and flipping each PNG; sprites are subsurfaces of
+# that image, so every sprite blit reads from the same source surface.
+#
+#   python -m game.atlas      # build the atlas for the current config ahead of time
+
+ATLAS_FORMAT = 1
+ATLAS_WIDTH = 512
+SPAWN_SCALE_MIN = 0.9
+
+# kind -> (file next to this module, target height before WINDOW_SCALE)
+SPRITES = {
+    'worker': ('worker.png', WORKER_SIZE),
+    'soldier': ('soldier.png', SOLDIER_SIZE),
+    'house': ('house.png', HOUSE_SIZE),
+    'tower': ('tower.png', TOWER_SIZE),
+    'grass': ('grass.png', GRASS_SIZE),
+    'tree': ('tree.png', TREE_SIZE),
+    'boulder': ('boulder.png', BOULDER_SIZE),
+}
+MIRRORED = ('worker', 'soldier', 'house', 'tower')    # drawn facing left on the R side
+SPAWN_SCALED = ('house', 'tower')
+
+
+def spawn_sizes(w, h):
+    """Every (w, h) draw_base asks for while a w x h sprite scales in from SPAWN_SCALE_MIN to 1:
+    the sizes at the scale factors where int(w * s) or int(h * s) steps."""
+    lo = SPAWN_SCALE_MIN
+    scales = {lo} | {k / n for n in (w, h) for k in range(int(n * lo), n) if lo <= k / n < 1.0}
+    return sorted({(max(1, int(w * s)), max(1, int(h * s))) for s in scales})
+
+
+def _scaled(kind):
+    filename, size = SPRITES[kind]
+    base = pygame.image.load(os.path.join(os.path.dirname(__file__), filename)).convert_alpha()
+    target_h = max(1, int(round(size * WINDOW_SCALE)))
+    if base.get_height() == target_h:
+        return base
+    aspect = base.get_width() / max(1, base.get_height())
+    return pygame.transform.smoothscale(base, (max(1, int(round(target_h * aspect))), target_h))
+
+
+def render_sprites():
+    """{key: surface} for every atlas entry; keys are (kind, side) and (kind, side, w, h)."""
+    images = {}
+    for kind in SPRITES:
+        img = _scaled(kind)
+        images[(kind, 'L')] = img
+        if kind in MIRRORED:
+            images[(kind, 'R')] = pygame.transform.flip(img, True, False)
+    for kind in SPAWN_SCALED:
+        for side in ('L', 'R'):
+            img = images[(kind, side)]
+            for w, h in spawn_sizes(*img.get_size()):
+                images[(kind, side, w, h)] = pygame.transform.smoothscale(img, (w, h))
+    return images
+
+
+def pack(images, width=ATLAS_WIDTH):
+    """Shelf-pack surfaces into one SRCALPHA surface; returns (surface, {key: (x, y, w, h)})."""
+    rects = {}
+    x = y = shelf_h = 0
+    for key, img in sorted(images.items(), key=lambda kv: (-kv[1].get_height(), -kv[1].get_width())):
+        w, h = img.get_size()
+        if x + w > width:
+            x, y, shelf_h = 0, y + shelf_h + 1, 0
+        rects[key] = (x, y, w, h)
+        x += w + 1
+        shelf_h = max(shelf_h, h)
+    surface = pygame.Surface((width, max(1, y + shelf_h)), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    for key, img in images.items():
+        # MAX onto transparent black copies RGBA exactly (a normal blit would blend edge pixels)
+        surface.blit(img, rects[key][:2], special_flags=pygame.BLEND_RGBA_MAX)
+    return surface, rects
+
+
+def atlas_name():
+    """Cache file stem: the scale, sprite sizes and source PNG stamps the atlas is built from."""
+    here = os.path.dirname(__file__)
+    stamps = []
+    for filename, size in SPRITES.values():
+        st = os.stat(os.path.join(here, filename))
+        stamps.append(f"{filename}:{size}:{st.st_size}:{st.st_mtime_ns}")
+    digest = hashlib.sha1(";".join(stamps).encode()).hexdigest()[:12]
+    return f"atlas{ATLAS_FORMAT}_{WINDOW_SCALE:g}x_{digest}"
+
+
+class SpriteAtlas:
+    """One atlas surface and the sprites cut from it; get()/scaled() return subsurfaces."""
+
+    def __init__(self, surface, rects):
+        self.surface = surface
+        self.rects = rects
+        self._sprites = {key: surface.subsurface(rect) for key, rect in rects.items()}
+        self._extra = {}
+
+    def get(self, kind, side):
+        """Sprite of kind in SPRITES, oriented for side 'L' or 'R'."""
+        return self._sprites[(kind, side if kind in MIRRORED else 'L')]
+
+    def scaled(self, kind, side, w, h):
+        """The sprite smoothscaled to w x h: from the atlas for spawn scale-in sizes, else scaled
+        once and kept."""
+        side = side if kind in MIRRORED else 'L'
+        key = (kind, side, w, h)
+        img = self._sprites.get(key)
+        if img is None:
+            img = self._extra.get(key)
+        if img is None:
+            img = self._extra[key] = pygame.transform.smoothscale(self.get(kind, side), (w, h))
+        return img
+
+    @classmethod
+    def build(cls):
+        return cls(*pack(render_sprites()))
+
+    @classmethod
+    def load(cls, stem):
+        """The atlas cached under `stem`, or None if it is missing or unreadable."""
+        try:
+            with open(f"{stem}.json") as f:
+                index = json.load(f)
+            surface = pygame.image.load(f"{stem}.png").convert_alpha()
+        except (OSError, ValueError, pygame.error):
+            return None
+        if index.get("format") != ATLAS_FORMAT or list(surface.get_size()) != index.get("size"):
+            return None
+        rects = {tuple(key): tuple(rect) for key, rect in index["sprites"]}
+        return cls(surface, rects)
+
+    def save(self, stem):
+        buf = io.BytesIO()
+        pygame.image.save(self.surface, buf, "atlas.png")
+        index = {"format": ATLAS_FORMAT, "size": list(self.surface.get_size()),
+                 "sprites": [[list(key), list(rect)] for key, rect in self.rects.items()]}
+        # Image first: a reader that finds the index finds its image
+        return atomic_write(f"{stem}.png", buf.getvalue()) and atomic_write(f"{stem}.json", json.dumps(index).encode())
+
+
+_ATLAS = None
+
+
+def get_atlas():
+    """The process's sprite atlas: loaded from the disk cache, or built (and cached) on first
+    use. Needs a display mode set, like any convert_alpha()."""
+    global _ATLAS
+    if _ATLAS is None:
+        folder = cache_dir("atlas")
+        stem = os.path.join(folder, atlas_name()) if folder else None
+        atlas = SpriteAtlas.load(stem) if stem else None
+        if atlas is None:
+            atlas = SpriteAtlas.build()
+            if stem:
+                atlas.save(stem)
+        _ATLAS = atlas
+    return _ATLAS
+
+
+if __name__ == "__main__":
+    from .record import use_headless
+    use_headless()
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    folder = cache_dir("atlas")
+    stem = os.path.join(folder, atlas_name()) if folder else None
+    atlas = SpriteAtlas.build()
+    if stem is None or not atlas.save(stem):
+        raise SystemExit("no writable cache directory (set PYGAMES_CACHE_DIR)")
+    w, h = atlas.surface.get_size()
+    print(f"{stem}.png: {len(atlas.rects)} sprites in {w}x{h}")
@@ -0,0 +1,63 @@
+import types
+from collections.abc import Awaitable
+
+from .config import BOT_TIMEOUT
+
+# Bot calls shared by the engines. Plain bots are called one after another, as always;
+# `async def` bots are started together and awaited with a BOT_TIMEOUT deadline each, so a
+# step waits for the slowest async bot rather than the sum of them. A bot that raises or
+# misses its deadline gets the exception in its slot and the engine applies its own default.
+# asyncio is imported on the first async bot only: it is most of a headless engine's startup.
+
+_LOOP = None
+_CO_ITERABLE_COROUTINE = 0x100   # inspect.CO_ITERABLE_COROUTINE
+
+
+def isawaitable(obj):
+    """inspect.isawaitable without importing inspect (which costs as much as the engine): native
+    coroutines, @types.coroutine generators and objects with __await__."""
+    return (isinstance(obj, Awaitable) or
+            isinstance(obj, types.GeneratorType) and bool(obj.gi_code.co_flags & _CO_ITERABLE_COROUTINE))
+
+
+def get_loop():
+    """Event loop async bots run on. It persists across steps, so bots can keep sessions open."""
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed():
+        import asyncio
+        _LOOP = asyncio.new_event_loop()
+    return _LOOP
+
+
+async def _deadline(aw, timeout):
+    import asyncio
+    try:
+        return await asyncio.wait_for(aw, timeout)
+    except TimeoutError:
+        raise TimeoutError(f"no decision within {timeout:g}s") from None
+
+
+async def _gather(awaitables, timeout):
+    import asyncio
+    return await asyncio.gather(*(_deadline(aw, timeout) for aw in awaitables), return_exceptions=True)
+
+
+def decide_all(bots, views, timeout=BOT_TIMEOUT):
+    """Call bots[k](views[k]) for every k. Returns one entry per bot: its action, or the
+    Exception it raised (or TimeoutError for an async bot that missed the deadline)."""
+    out = [None] * len(bots)
+    pending = []
+    for k, (bot, view) in enumerate(zip(bots, views)):
+        try:
+            act = bot(view)
+        except Exception as e:
+            out[k] = e
+            continue
+        if isawaitable(act):
+            pending.append(k)
+        out[k] = act
+    if pending:
+        done = get_loop().run_until_complete(_gather([out[k] for k in pending], timeout))
+        for k, act in zip(pending, done):
+            out[k] = act
+    return out
@@ -0,0 +1,31 @@
+import os
+
+# On-disk cache location shared by generated assets (noise, atlases, ...).
+# Override with PYGAMES_CACHE_DIR; defaults to ~/.cache/pygames.
+
+
+def cache_dir(*parts):
+    """Return (and create) a cache directory, or None if it cannot be created."""
+    root = os.environ.get("PYGAMES_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "pygames")
+    path = os.path.join(root, *parts)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def atomic_write(path, data: bytes):
+    """Write bytes to path via a temp file + rename so readers never see partial files."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+    return True
@@ -0,0 +1,51 @@
+import time
+
+# Frame clocks. Everything that animates or paces the game asks the active clock for time,
+# so the same loops can run live (wall time, frame-limited) or offline (virtual time that
+# advances exactly one frame per tick and never sleeps).
+
+
+class WallClock:
+    """Real time: time.time() plus pygame's frame limiter."""
+
+    def __init__(self):
+        self._limiter = None
+
+    def now(self):
+        return time.time()
+
+    def tick(self, fps=0):
+        if self._limiter is None:
+            import pygame
+            self._limiter = pygame.time.Clock()
+        return self._limiter.tick(fps)
+
+
+class VirtualClock:
+    """Deterministic time for offline rendering: each tick advances exactly 1/fps seconds."""
+
+    def __init__(self, start=0.0):
+        self.t = start
+
+    def now(self):
+        return self.t
+
+    def tick(self, fps=0):
+        dt = 1.0 / fps if fps else 0.0
+        self.t += dt
+        return dt * 1000.0
+
+
+_CLOCK = WallClock()
+
+
+def get_clock():
+    return _CLOCK
+
+
+def set_clock(clock):
+    """Install clock as the active clock and return the previous one."""
+    global _CLOCK
+    prev = _CLOCK
+    _CLOCK = clock
+    return prev
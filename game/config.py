@@ -16,6 +16,18 @@ HOUSE_WORKER_BONUS    = 3     # extra workers/house/step
 HOUSE_COST            = 20    # workers
 DEFENSE_COST          = 20    # workers
 DEFENSE_HEALTH     = 30
+# Counts (workers, soldiers, houses) saturate at this value; 0 = exact, unbounded integers.
+# WORKER_BONUS compounds, so long matches otherwise grow counts into ever larger bignums.
+COUNT_CAP          = 0
+BOUNDED_COUNT_CAP  = 10**18   # the --bounded cap: fits int64 (and a double exactly)
+
+# Economy constants that can be overridden per match (see economy())
+ECONOMY_KEYS = ("BASE_WORKERS_PER_STEP", "WORKER_BONUS", "HOUSE_WORKER_BONUS", "HOUSE_COST", "DEFENSE_COST", "DEFENSE_HEALTH",
+                "COUNT_CAP")
+# Lower bound per economy constant, and whether the bound itself is allowed: costs divide the
+# worker count and towers need health, so those must be positive
+ECONOMY_MIN = {"BASE_WORKERS_PER_STEP": (0, True), "WORKER_BONUS": (0, False), "HOUSE_WORKER_BONUS": (0, True),
+               "HOUSE_COST": (0, False), "DEFENSE_COST": (0, False), "DEFENSE_HEALTH": (0, False), "COUNT_CAP": (0, True)}
 
 SEED = None                   # set to an int for reproducibility
 
@@ -23,6 +35,12 @@ SEED = None                   # set to an int for reproducibility
 # 1.0 = real time, 2.0 = 2x faster
 TIME_SCALE = 1
 
+# Fast-forward (F key): simulation steps per frame; attack animations are skipped
+FAST_FORWARD_STEPS = 8
+
+# Seconds an async or sandboxed bot gets per decision before the default action is used
+BOT_TIMEOUT = 0.5
+
 # Window scale (applies to resolution and sizes)
 # 1.0 = native size; e.g., 1.5 = 150% window; larger scene and sprites
 WINDOW_SCALE = 2
@@ -50,3 +68,19 @@ TOWER_SIZE   = 24
 GRASS_SIZE   = 10
 TREE_SIZE    = 18
 BOULDER_SIZE = 16
+
+
+def economy(**overrides):
+    """Economy constants as a dict (defaults from this module), e.g. economy(HOUSE_COST=30).
+    Engines that accept `econ` read it instead of the module globals, so matches with different
+    settings can run side by side. Raises ValueError for an unknown key or an out-of-range value."""
+    unknown = set(overrides) - set(ECONOMY_KEYS)
+    if unknown:
+        raise ValueError(f"not an economy constant: {', '.join(sorted(unknown))}")
+    for k, v in overrides.items():
+        lo, inclusive = ECONOMY_MIN[k]
+        if isinstance(v, bool) or not isinstance(v, (int, float)) or not (v >= lo if inclusive else v > lo):
+            raise ValueError(f"{k} must be a number {'>=' if inclusive else '>'} {lo}, got {v!r}")
+    econ = {k: globals()[k] for k in ECONOMY_KEYS}
+    econ.update(overrides)
+    return econ
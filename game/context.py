@@ -0,0 +1,45 @@
+import random
+from .clock import get_clock
+from .config import SEED, economy
+
+# Per-match state that used to be process-global: economy rules, RNGs and the clock.
+# Every PlayerState carries its match's context, so model, view, anim and the run loops read
+# rules, randomness and time from the match they belong to; two matches with different
+# settings, seeds or clocks can run in one process (or thread pool) without cross-talk.
+# Window and pacing constants (WIDTH, FPS, STEP_TIME, ...) stay in game/config.py.
+
+
+class MatchContext:
+    """Config, gameplay RNG, visual RNG and clock for one match.
+
+    seed: seeds both RNGs (None = nondeterministic).
+    econ: economy constants (game.config.economy(...)); defaults to game/config.py.
+    clock: game.clock clock; defaults to whichever clock is active (game.clock.get_clock()).
+    """
+
+    def __init__(self, seed=None, econ=None, clock=None):
+        self.seed = seed
+        self.econ = econ if econ is not None else economy()
+        # Gameplay placements (houses, towers, garrison slots) vs cosmetics (wander, volleys)
+        self.rng = random.Random(seed)
+        self.vis_rng = random.Random(None if seed is None else f"vis:{seed}")
+        self._clock = clock
+
+    @property
+    def clock(self):
+        return self._clock if self._clock is not None else get_clock()
+
+    @clock.setter
+    def clock(self, clock):
+        self._clock = clock
+
+
+_DEFAULT = None
+
+
+def default_context():
+    """Shared context for PlayerStates created without one (seeded from config.SEED)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = MatchContext(seed=SEED)
+    return _DEFAULT
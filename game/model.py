@@ -1,16 +1,75 @@
-import math, random, time
-from .config import WIDTH, HEIGHT, FIELD_MARGIN, BASE_WORKERS_PER_STEP, HOUSE_WORKER_BONUS, HOUSE_COST, DEFENSE_COST, DEFENSE_HEALTH, WORKER_BONUS
+import math, struct
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+from .config import WIDTH, HEIGHT, FIELD_MARGIN, ECONOMY_KEYS
+from .context import MatchContext, default_context
 
 
-class PlayerState:
-    def __init__(self, name, side):
+class PlayerCore:
+    """One player's gameplay state: the counts the rules act on and nothing visual.
+    Headless engines use it directly; PlayerState adds the sprites of the windowed games.
+    towers: one {"hp": n} record per defense tower, in the order combat damages them."""
+    __slots__ = ("name", "ctx", "workers", "soldiers", "houses", "defenses", "towers", "attack_pct",
+                 "dead", "last_action", "last_worker_bonus", "stats", "_bot_view")
+
+    def __init__(self, name, ctx=None):
         self.name = name
-        self.side = side  # "L" or "R"
+        self.ctx = ctx or default_context()  # rules, RNGs and clock of the match (game.context)
         self.workers  = 20
         self.soldiers = 0
         self.houses   = 0
         self.defenses = 0
+        self.towers = []
         self.attack_pct = 0.0  # persisted between steps
+        self.dead = False
+        self.last_action = ""
+        self.last_worker_bonus = 0
+        self.stats = StatsView(self)  # what bots see as state.me / state.opp
+        self._bot_view = None
+
+    def clone(self):
+        """A PlayerCore with the same counts and towers (tower records copied), sharing the context."""
+        c = PlayerCore(self.name, self.ctx)
+        c.workers, c.soldiers, c.houses, c.defenses = self.workers, self.soldiers, self.houses, self.defenses
+        c.towers = [{"hp": t["hp"]} for t in self.towers]
+        c.attack_pct, c.dead = self.attack_pct, self.dead
+        c.last_action, c.last_worker_bonus = self.last_action, self.last_worker_bonus
+        return c
+
+    def bot_view(self, step, opp):
+        """This player's BotView for `step` against `opp`. One view per player, refreshed in place."""
+        view = self._bot_view
+        if view is None:
+            view = self._bot_view = BotView(step, self, opp)
+        else:
+            view.step = step
+            view.opp = opp.stats
+        return view
+
+    # No defense multiplier — defenses are HP-based towers now
+
+    def spawn_workers(self):
+        econ = self.ctx.econ
+        base, per_house, growth = econ["BASE_WORKERS_PER_STEP"], econ["HOUSE_WORKER_BONUS"], econ["WORKER_BONUS"]
+        # Bonus based on current workers before base/house additions
+        bonus = int(self.workers * max(0.0, (growth - 1.0)))
+        self.last_worker_bonus = bonus
+        self.workers = saturate(self.workers + base + self.houses * per_house + bonus, econ["COUNT_CAP"])
+
+
+def saturate(n, cap):
+    """A count after growth under COUNT_CAP: n, or cap when a cap is set and n is past it.
+    A saturated count stays at the cap until spending or combat takes it below."""
+    return cap if cap and n > cap else n
+
+
+class PlayerState(PlayerCore):
+    """A PlayerCore with the sprites of the windowed games: positions, wander, build tasks and
+    effects, owned by game/view.py and game/anim.py. Tower records get x/y when placed."""
+
+    def __init__(self, name, side, ctx=None):
+        super().__init__(name, ctx)
+        self.side = side  # "L" or "R"
 
         self.base_x = FIELD_MARGIN if side=="L" else WIDTH - FIELD_MARGIN
         self.base_y = HEIGHT//2
@@ -21,23 +80,20 @@ class PlayerState:
         self._worker_tasks = []      # list[{i, tx, ty, ttl}] temporary build tasks
         self._soldier_positions = [] # list[(x,y)]
         self._house_positions = []   # list[(x,y)]
-        self._defense_positions = [] # list[{x,y,hp}]
         # Ingress/egress visuals
         self._soldier_incoming = []  # list[{x,y,tx,ty}]
         self._worker_departures = [] # list[{i, tx, ty, ttl}]
-        # UI
-        self.last_action = ""
-        self.last_worker_bonus = 0
         # Visual effects
         self._spawn_bursts = []  # list of dicts: {x,y,until}
 
-    # No defense multiplier — defenses are HP-based towers now
+    # Towers as the drawing code knows them: the core's records, with x/y once placed
+    @property
+    def _defense_positions(self):
+        return self.towers
 
-    def spawn_workers(self):
-        # Bonus based on current workers before base/house additions
-        bonus = int(self.workers * max(0.0, (WORKER_BONUS - 1.0)))
-        self.last_worker_bonus = bonus
-        self.workers += BASE_WORKERS_PER_STEP + self.houses * HOUSE_WORKER_BONUS + bonus
+    @_defense_positions.setter
+    def _defense_positions(self, towers):
+        self.towers = towers
 
     # ----- Visual placement helpers -----
     def _side_bounds(self):
@@ -47,6 +103,7 @@ class PlayerState:
             return WIDTH//2 + 80, WIDTH - 20
 
     def add_houses(self, n: int):
+        rng = self.ctx.rng
         if n <= 0:
             return []
         left, right = self._side_bounds()
@@ -60,8 +117,8 @@ class PlayerState:
         for _ in range(n):
             placed = False
             for _try in range(30):
-                x = random.randint(min(cx-120, right-20), max(cx+120, left+20))
-                y = random.randint(v_top, v_bottom)
+                x = rng.randint(min(cx-120, right-20), max(cx+120, left+20))
+                y = rng.randint(v_top, v_bottom)
                 x = max(left+10, min(right-10, x))
                 y = max(v_margin, min(HEIGHT - v_margin, y))
                 ok = True
@@ -74,13 +131,14 @@ class PlayerState:
                     placed = True
                     break
             if not placed:
-                hx = cx + random.randint(-30,30)
-                hy = max(v_top, min(v_bottom, cy + random.randint(-60,60)))
+                hx = cx + rng.randint(-30,30)
+                hy = max(v_top, min(v_bottom, cy + rng.randint(-60,60)))
                 self._house_positions.append((hx, hy))
                 added.append((hx, hy))
         return added
 
     def add_soldiers(self, n: int):
+        rng = self.ctx.rng
         if n <= 0:
             return
         direction = 1 if self.side=="L" else -1
@@ -90,12 +148,13 @@ class PlayerState:
         for i in range(n):
             row = (len(self._soldier_positions)+i) // cols
             col = (len(self._soldier_positions)+i) % cols
-            ox = direction * (col*12 + random.uniform(-4.0, 4.0))
-            oy = (row-2)*12 + random.uniform(-6.0, 6.0)
+            ox = direction * (col*12 + rng.uniform(-4.0, 4.0))
+            oy = (row-2)*12 + rng.uniform(-6.0, 6.0)
             self._soldier_positions.append((start_x + ox, start_y + oy))
 
     def plan_soldier_targets(self, n: int):
         """Compute n new garrison target positions without mutating the current list."""
+        rng = self.ctx.rng
         if n <= 0:
             return []
         direction = 1 if self.side=="L" else -1
@@ -107,13 +166,14 @@ class PlayerState:
         for i in range(n):
             row = (len(base)+i) // cols
             col = (len(base)+i) % cols
-            ox = direction * (col*12 + random.uniform(-4.0, 4.0))
-            oy = (row-2)*12 + random.uniform(-6.0, 6.0)
+            ox = direction * (col*12 + rng.uniform(-4.0, 4.0))
+            oy = (row-2)*12 + rng.uniform(-6.0, 6.0)
             targets.append((start_x + ox, start_y + oy))
         return targets
 
     def schedule_soldier_ingress(self, n: int):
         """Visually bring n soldiers from offscreen to their garrison targets."""
+        rng = self.ctx.rng
         targets = self.plan_soldier_targets(n)
         if not targets:
             return
@@ -122,7 +182,7 @@ class PlayerState:
         else:
             sx = WIDTH + 50
         for tx, ty in targets:
-            sy = ty + random.randint(-40, 40)
+            sy = ty + rng.randint(-40, 40)
             self._soldier_incoming.append({"x": sx, "y": sy, "tx": tx, "ty": ty})
 
     def pop_attacking_soldiers(self, n: int):
@@ -143,9 +203,11 @@ class PlayerState:
         """Create visual defense tower positions biased toward the owner's side.
         In 1v1, place them roughly halfway between the base and the old midline ring
         (about 50% closer to the owning team compared to the previous placement)."""
+        rng = self.ctx.rng
         if n <= 0:
             return []
         sites = []
+        hp = self.ctx.econ["DEFENSE_HEALTH"]
         # Previous midline-adjacent centers
         old_mid_x = WIDTH//2 - 70 if self.side == "L" else WIDTH//2 + 70
         # Move the ring ~50% toward the owner's base
@@ -155,8 +217,8 @@ class PlayerState:
         v_top = max(v_margin, int(self.base_y - (HEIGHT * 0.40)))
         v_bottom = min(HEIGHT - v_margin, int(self.base_y + (HEIGHT * 0.40)))
         for _ in range(n):
-            x = x_center + random.randint(-12, 12)
-            y = random.randint(v_top, v_bottom)
+            x = x_center + rng.randint(-12, 12)
+            y = rng.randint(v_top, v_bottom)
             # avoid overlapping too closely with existing towers
             ok = True
             for t in self._defense_positions:
@@ -165,13 +227,13 @@ class PlayerState:
                 if (tx - x)**2 + (ty - y)**2 < 20*20:
                     ok = False; break
             if ok:
-                self._defense_positions.append({"x": x, "y": y, "hp": DEFENSE_HEALTH})
+                self._defense_positions.append({"x": x, "y": y, "hp": hp})
                 sites.append((x, y))
             else:
                 # fallback slight jitter
-                x2 = x_center + random.randint(-6, 6)
-                y2 = max(v_top, min(v_bottom, self.base_y + random.randint(-120, 120)))
-                self._defense_positions.append({"x": x2, "y": y2, "hp": DEFENSE_HEALTH})
+                x2 = x_center + rng.randint(-6, 6)
+                y2 = max(v_top, min(v_bottom, self.base_y + rng.randint(-120, 120)))
+                self._defense_positions.append({"x": x2, "y": y2, "hp": hp})
                 sites.append((x2, y2))
         return sites
 
@@ -179,7 +241,7 @@ class PlayerState:
     def _record_spawns(self, sites, duration=0.6):
         if not sites:
             return
-        until = time.time() + duration
+        until = self.ctx.clock.now() + duration
         for (x, y) in sites:
             self._spawn_bursts.append({"x": x, "y": y, "until": until})
 
@@ -214,6 +276,7 @@ class PlayerState:
             taken.add(i)
 
     def schedule_worker_departures(self, n: int, duration=9.0):
+        rng = self.ctx.rng
         if n <= 0 or not self._worker_positions:
             return
         # Choose nearest to base center to depart
@@ -229,20 +292,246 @@ class PlayerState:
         dists.sort()
         for _, i in dists[:n]:
             tx = side_tx
-            ty = self._worker_positions[i][1] + random.randint(-20, 20)
+            ty = self._worker_positions[i][1] + rng.randint(-20, 20)
             self._worker_tasks.append({'i': i, 'tx': tx, 'ty': ty, 'ttl': duration, 'consume': True, 'depart': True})
 
 
 class BotView:
-    __slots__ = ("step","me","opp","economy","costs")
-    def __init__(self, step, me: 'PlayerState', opp: 'PlayerState'):
+    """What a Workers & War bot receives. me/opp are live read-only views of the players and
+    economy/costs are shared constants, so building one allocates nothing per player stat.
+    The engines reuse one view per player (PlayerState.bot_view); copy values you want to keep."""
+    __slots__ = ("step","me","opp","economy","costs","_econ","_sims")
+    def __init__(self, step, me: 'PlayerCore', opp: 'PlayerCore'):
         self.step = step
-        self.me  = Simple(me.workers, me.soldiers, me.houses, me.defenses, me.attack_pct)
-        self.opp = Simple(opp.workers, opp.soldiers, opp.houses, opp.defenses, opp.attack_pct)
-        self.economy = Simple(BASE_WORKERS_PER_STEP, HOUSE_WORKER_BONUS, 0, 0, 0.0)
-        self.costs   = Simple(HOUSE_COST, DEFENSE_COST, 0, 0, 0.0)
+        self.me  = me.stats
+        self.opp = opp.stats
+        self._econ = me.ctx.econ
+        self.economy, self.costs = bot_constants(self._econ)
+        self._sims = None
+
+    def simulate(self, my_action=None, opp_action=None, steps=1):
+        """Projected (me, opp) after playing `steps` steps from here, as a Projection of Constants.
+
+        Actions are what a bot returns: a dict for this step (waiting afterwards) or a list of
+        dicts, one per step; None waits. Runs the engine's own rules (game_multi.headless.project)
+        on copies of both players, as a 1v1 against state.opp, without the windowed game's
+        garrison cap. Repeated queries within a step are answered from a cache. Raises TypeError
+        for an action of any other shape (e.g. a string).
+        """
+        my_steps, opp_steps = _as_steps(my_action, "my_action"), _as_steps(opp_action, "opp_action")
+        try:
+            key = (self.step, _freeze(my_steps), _freeze(opp_steps), steps)
+            hash(key)
+        except TypeError:
+            key = None     # unhashable action values: compute without caching
+        sims = self._sims
+        if sims is None or sims.get("step") != self.step:
+            sims = self._sims = {"step": self.step}
+        if key is not None and key in sims:
+            return sims[key]
+        from game_multi.headless import project
+        me, opp = _core_copy(self.me, self._econ), _core_copy(self.opp, self._econ)
+        project(me, opp, my_steps, opp_steps, steps)
+        out = Projection(_constants(me), _constants(opp))
+        if key is not None:
+            if len(sims) > SIM_CACHE_SIZE:
+                sims.clear()
+                sims["step"] = self.step
+            sims[key] = out
+        return out
+
+
+# Cached simulate() results per view and step
+SIM_CACHE_SIZE = 1024
+
+Projection = namedtuple("Projection", "me opp")
+
+
+def _freeze(steps):
+    return tuple(None if a is None else tuple(sorted(a.items())) for a in steps)
+
+
+def _as_steps(action, name):
+    """simulate()'s action argument as a list of per-step actions (dict or None)."""
+    if action is None:
+        return []
+    if isinstance(action, dict):
+        return [action]
+    if isinstance(action, (list, tuple)) and all(a is None or isinstance(a, dict) for a in action):
+        return list(action)
+    raise TypeError(f"simulate(): {name} must be None, an action dict or a list of them, "
+                    f"not {type(action).__name__} {action!r:.40}")
+
+
+def _core_copy(stats, econ):
+    """A PlayerCore to simulate with: a clone of the live player, or built from a Constants
+    snapshot (sandboxed bots), whose towers are assumed at full HP."""
+    if isinstance(stats, StatsView):
+        return stats._p.clone()
+    c = PlayerCore("sim", MatchContext(econ=econ))
+    c.workers, c.soldiers, c.houses, c.defenses, c.attack_pct = stats
+    c.towers = [{"hp": econ["DEFENSE_HEALTH"]} for _ in range(stats.defenses)]
+    return c
+
+
+def _constants(p):
+    return Constants(p.workers, p.soldiers, p.houses, p.defenses, p.attack_pct)
+
+
+class StatsView:
+    """Read-only live view of a player's workers, soldiers, houses, defenses and attack_pct."""
+    __slots__ = ("_p",)
+    def __init__(self, player):
+        self._p = player
+
+    workers    = property(lambda self: self._p.workers)
+    soldiers   = property(lambda self: self._p.soldiers)
+    houses     = property(lambda self: self._p.houses)
+    defenses   = property(lambda self: self._p.defenses)
+    attack_pct = property(lambda self: self._p.attack_pct)
+
+    def __repr__(self):
+        return (f"StatsView(workers={self.workers}, soldiers={self.soldiers}, houses={self.houses}, "
+                f"defenses={self.defenses}, attack_pct={self.attack_pct})")
+
+
+# Immutable constants in the field layout bots already use (economy.workers == BASE_WORKERS_PER_STEP, ...)
+Constants = namedtuple("Constants", "workers soldiers houses defenses attack_pct")
+_CONSTANTS = {}
+
+
+class Economy(Constants):
+    """state.economy: the Constants fields (workers == BASE_WORKERS_PER_STEP, soldiers ==
+    HOUSE_WORKER_BONUS) plus worker projections, i.e. the recurrence of PlayerCore.spawn_workers
+    (base + houses * bonus + int(workers * (WORKER_BONUS - 1))) with nothing spent, held at
+    COUNT_CAP when the economy sets one.
+
+    Projections come from tables shared by every bot on the same economy: one row of worker
+    counts per (workers, houses) start, built lazily up to the furthest step asked for (at most
+    ECONOMY_HORIZON) and evicted least recently used beyond ECONOMY_TABLE_ROWS rows. Without
+    compounding (WORKER_BONUS <= 1) the count is linear and needs no table.
+    """
+
+    def __new__(cls, base, per_house, growth, cap=0):
+        self = super().__new__(cls, base, per_house, 0, 0, 0.0)
+        self.rate = max(0.0, growth - 1.0)
+        self.cap = cap
+        self._rows = OrderedDict()
+        return self
+
+    def workers_after(self, workers, houses, k):
+        """Workers after k more spawns from `workers` with `houses` houses, building nothing."""
+        if k <= 0:
+            return workers
+        if not self.rate:
+            return saturate(workers + k * (self.workers + houses * self.soldiers), self.cap)
+        row = self._row(workers, houses, k)
+        if k < len(row):
+            return row[k]
+        # Past the table's horizon: continue from its last entry
+        w, add, rate, cap = row[-1], self.workers + houses * self.soldiers, self.rate, self.cap
+        for _ in range(k - len(row) + 1):
+            if cap and w >= cap:
+                break
+            w = saturate(w + add + int(w * rate), cap)
+        return w
+
+    def steps_until(self, target, workers, houses, limit=None):
+        """Fewest spawns until at least `target` workers (0 if already there), or None if not
+        within `limit` steps (default ECONOMY_HORIZON)."""
+        limit = ECONOMY_HORIZON if limit is None else limit
+        if workers >= target:
+            return 0
+        if self.cap and target > self.cap:
+            return None
+        if not self.rate:
+            add = self.workers + houses * self.soldiers
+            k = -(-(target - workers) // add) if add > 0 else None
+            return k if k is not None and k <= limit else None
+        row = self._row(workers, houses, min(limit, ECONOMY_HORIZON))
+        k = bisect_left(row, target, 0, min(len(row), limit + 1))
+        if k <= limit and k < len(row):
+            return k
+        if limit <= ECONOMY_HORIZON:
+            return None
+        k = len(row) - 1
+        while k < limit:
+            k += 1
+            if self.workers_after(workers, houses, k) >= target:
+                return k
+        return None
+
+    def _row(self, workers, houses, k):
+        rows = self._rows
+        key = (workers, houses)
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = [workers]
+            if len(rows) > ECONOMY_TABLE_ROWS:
+                rows.popitem(last=False)
+        else:
+            rows.move_to_end(key)
+        n = min(k, ECONOMY_HORIZON)
+        if len(row) <= n:
+            w, add, rate, cap = row[-1], self.workers + houses * self.soldiers, self.rate, self.cap
+            for _ in range(n - len(row) + 1):
+                w = saturate(w + add + int(w * rate), cap)
+                row.append(w)
+        return row
+
+
+# Projection tables per economy: rows kept, and steps per row
+ECONOMY_TABLE_ROWS = 4096
+ECONOMY_HORIZON = 1000
+
+
+def bot_constants(econ):
+    """(economy, costs) for an economy dict; one shared pair per distinct set of values, so
+    economy projection tables are shared too."""
+    key = (econ["BASE_WORKERS_PER_STEP"], econ["HOUSE_WORKER_BONUS"], econ["HOUSE_COST"], econ["DEFENSE_COST"],
+           econ["WORKER_BONUS"], econ["COUNT_CAP"])
+    pair = _CONSTANTS.get(key)
+    if pair is None:
+        pair = _CONSTANTS[key] = (Economy(key[0], key[1], key[4], key[5]), Constants(key[2], key[3], 0, 0, 0.0))
+    return pair
+
+
+def _int64(n):
+    return n if -_INT64_MAX <= n <= _INT64_MAX else _INT64_MAX if n > 0 else -_INT64_MAX
+
+
+_INT64_MAX = 2**63 - 1
+
+
+class _BotViewCodec:
+    """Fixed binary layout of a BotView, for bots running out of process (game.sandbox).
+    The worker side gets me/opp as Constants and economy/costs rebuilt from the economy dict.
+    Counts are int64: an unbounded (COUNT_CAP = 0) count past 2**63 - 1 reaches the bot as
+    2**63 - 1, the match itself keeps the exact value."""
+    _fmt = struct.Struct("<q" + "4qd" * 4 + "d" * len(ECONOMY_KEYS))
+
+    size = _fmt.size
+
+    def pack(self, view, buf):
+        me, opp, eco, cost = view.me, view.opp, view.economy, view.costs
+        q = _int64
+        self._fmt.pack_into(buf, 0, view.step,
+                            q(me.workers), q(me.soldiers), q(me.houses), q(me.defenses), me.attack_pct,
+                            q(opp.workers), q(opp.soldiers), q(opp.houses), q(opp.defenses), opp.attack_pct,
+                            eco.workers, eco.soldiers, eco.houses, eco.defenses, eco.attack_pct,
+                            cost.workers, cost.soldiers, cost.houses, cost.defenses, cost.attack_pct,
+                            *(view._econ[k] for k in ECONOMY_KEYS))
+
+    def unpack(self, buf):
+        v = self._fmt.unpack_from(buf, 0)
+        view = BotView.__new__(BotView)
+        view.step = v[0]
+        view.me, view.opp = Constants(*v[1:6]), Constants(*v[6:11])
+        # Whole numbers back to ints, so costs and counts keep their types
+        view._econ = {k: int(x) if x.is_integer() else x for k, x in zip(ECONOMY_KEYS, v[21:])}
+        view.economy, view.costs = bot_constants(view._econ)
+        view._sims = None
+        return view
 
 
-class Simple:
-    def __init__(self, a,b,c,d,e):
-        self.workers=a; self.soldiers=b; self.houses=c; self.defenses=d; self.attack_pct=e
+BOT_VIEW_CODEC = _BotViewCodec()
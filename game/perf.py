@@ -0,0 +1,167 @@
+import os, time, atexit
+from collections import deque
+
+# Frame-time profiler shared by the game loops.
+# Loops wrap their phases (bots, sim, field, bases, attack, hud, flip, wait) in
+# `with prof.phase(name):` and call prof.end_frame() once per frame. Timings are exclusive
+# (a nested phase pauses its parent) and kept in fixed-size ring buffers, so the profiler is
+# always on at the cost of a few perf_counter() calls per phase.
+# Press P in a game to toggle the overlay; set PYGAMES_PROFILE_CSV=path to dump the buffers
+# on exit.
+
+PROFILE_FRAMES = 3600     # ring buffer length (frames)
+STATS_EVERY = 30          # overlay percentiles are refreshed every N frames
+GRAPH_W, GRAPH_H = 240, 60
+
+
+def percentile(values, q):
+    """q-th percentile (0..100) of values by nearest rank; 0.0 for no values."""
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(q / 100.0 * (len(s) - 1)))))
+    return s[k]
+
+
+class _Phase:
+    __slots__ = ("prof", "name")
+
+    def __init__(self, prof, name):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.prof.push(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.pop()
+        return False
+
+
+class FrameProfiler:
+    """Per-phase frame timings in ring buffers, with an overlay and a CSV dump."""
+
+    def __init__(self, frames=PROFILE_FRAMES):
+        self.frames = frames
+        self.show = False
+        self.reset()
+
+    def reset(self):
+        self.history = {}                          # phase -> deque of ms per frame
+        self.totals = deque(maxlen=self.frames)    # ms per frame
+        self._cur = {}
+        self._stack = []
+        self._mark = time.perf_counter()
+        self._frame_start = self._mark
+        self._frame_nr = 0
+        self._stats = []
+
+    def phase(self, name):
+        """Context manager timing a block under `name` (exclusive of nested phases)."""
+        return _Phase(self, name)
+
+    def push(self, name):
+        now = time.perf_counter()
+        if self._stack:
+            self._charge(self._stack[-1], now)
+        self._mark = now
+        self._stack.append(name)
+
+    def pop(self):
+        now = time.perf_counter()
+        self._charge(self._stack.pop(), now)
+        self._mark = now
+
+    def _charge(self, name, now):
+        self._cur[name] = self._cur.get(name, 0.0) + (now - self._mark) * 1000.0
+
+    def add(self, name, ms):
+        """Record time measured elsewhere (e.g. by a bot runner) against the current frame."""
+        self._cur[name] = self._cur.get(name, 0.0) + ms
+
+    def end_frame(self):
+        now = time.perf_counter()
+        total = (now - self._frame_start) * 1000.0
+        self._frame_start = now
+        for name in self._cur:
+            if name not in self.history:
+                # Pad with zeros so every buffer lines up frame-for-frame with totals
+                self.history[name] = deque([0.0] * len(self.totals), maxlen=self.frames)
+        for name, buf in self.history.items():
+            buf.append(self._cur.get(name, 0.0))
+        self.totals.append(total)
+        self._cur = {}
+        self._frame_nr += 1
+
+    def toggle(self):
+        self.show = not self.show
+        self._stats = []
+
+    def stats(self):
+        """[(phase, p50_ms, p99_ms)] over the buffered frames, 'frame' first."""
+        rows = [("frame", percentile(self.totals, 50), percentile(self.totals, 99))]
+        for name, buf in self.history.items():
+            rows.append((name, percentile(buf, 50), percentile(buf, 99)))
+        return rows
+
+    def draw_overlay(self, surface, pos=None):
+        """Draw the frame-time graph and per-phase p50/p99 if the overlay is on (default: bottom-left)."""
+        if not self.show:
+            return
+        import pygame
+        from .text import get_font, render_text
+        if not self._stats or self._frame_nr % STATS_EVERY == 0:
+            self._stats = self.stats()
+        font = get_font(16)
+        lines = [render_text(font, f"{name:<7} p50 {p50:6.2f}  p99 {p99:6.2f} ms", (240, 240, 240))
+                 for name, p50, p99 in self._stats]
+        panel_h = GRAPH_H + 6 + sum(img.get_height() for img in lines) + 6
+        panel_w = max([GRAPH_W] + [img.get_width() for img in lines]) + 12
+        panel = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        # Frame-time graph, newest on the right; the line marks a 60 FPS budget
+        scale = GRAPH_H / 50.0
+        budget = GRAPH_H - int(1000.0 / 60 * scale) + 6
+        pygame.draw.line(panel, (90, 200, 90, 220), (6, budget), (6 + GRAPH_W, budget))
+        recent = list(self.totals)[-GRAPH_W:]
+        if len(recent) >= 2:
+            pts = [(6 + GRAPH_W - len(recent) + i, 6 + GRAPH_H - min(GRAPH_H, int(ms * scale)))
+                   for i, ms in enumerate(recent)]
+            pygame.draw.lines(panel, (255, 200, 60, 255), False, pts)
+        ty = GRAPH_H + 12
+        for img in lines:
+            panel.blit(img, (6, ty))
+            ty += img.get_height()
+        if pos is None:
+            pos = (8, surface.get_height() - panel_h - 8)
+        surface.blit(panel, pos)
+
+    def dump_csv(self, path):
+        """Write the buffered frames as CSV: frame, total_ms, then one column per phase."""
+        names = list(self.history)
+        start = self._frame_nr - len(self.totals)
+        with open(path, "w") as f:
+            f.write(",".join(["frame", "total_ms"] + [f"{n}_ms" for n in names]) + "\n")
+            cols = [self.history[n] for n in names]
+            for i, row in enumerate(zip(self.totals, *cols)):
+                f.write(",".join([str(start + i)] + [f"{ms:.3f}" for ms in row]) + "\n")
+
+
+_PROFILER = FrameProfiler()
+
+
+def get_profiler():
+    return _PROFILER
+
+
+def _dump_on_exit():
+    path = os.environ.get("PYGAMES_PROFILE_CSV")
+    if path and _PROFILER.totals:
+        try:
+            _PROFILER.dump_csv(path)
+        except OSError as e:
+            print(f"[WARN] could not write profile CSV {path}: {e}")
+
+
+atexit.register(_dump_on_exit)
@@ -0,0 +1,63 @@
+import functools, os, sys
+import pygame
+from .clock import VirtualClock, get_clock, set_clock
+
+# Offline rendering helpers: SDL dummy driver + virtual clock, and a raw frame writer.
+# Frames are written back to back as raw RGB24 (width*height*3 bytes each), e.g.:
+#   python render_match.py ww --out - | ffmpeg -f rawvideo -pix_fmt rgb24 -s 2048x1200 -r 60 -i - final.mp4
+
+
+def use_headless():
+    """Select the SDL dummy drivers and a virtual clock. Call before pygame.init().
+    Returns the clock it replaced, for set_clock() to put back (see restores_clock)."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    return set_clock(VirtualClock())
+
+
+def restores_clock(fn):
+    """Decorator for match runners: the active clock is put back when fn returns or raises, so
+    a headless run's virtual clock doesn't outlive it in this process."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        prev = get_clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            set_clock(prev)
+    return wrapper
+
+
+class FrameRecorder:
+    """Stream every `every`-th presented frame as raw RGB bytes to a path, '-' (stdout) or a binary file."""
+
+    def __init__(self, out, every=1):
+        self.every = max(1, int(every))
+        self.frames_seen = 0
+        self.frames_written = 0
+        self._own = False
+        if out == "-":
+            self._f = sys.stdout.buffer
+        elif isinstance(out, (str, os.PathLike)):
+            self._f = open(out, "wb")
+            self._own = True
+        else:
+            self._f = out
+
+    def wants_frame(self):
+        """True if the next presented frame will be written."""
+        return self.frames_seen % self.every == 0
+
+    def capture(self, surface):
+        keep = self.wants_frame()
+        self.frames_seen += 1
+        if keep:
+            self._f.write(pygame.image.tobytes(surface, "RGB"))
+            self.frames_written += 1
+        return keep
+
+    def close(self):
+        if self._own:
+            self._f.close()
+        else:
+            self._f.flush()
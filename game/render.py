@@ -0,0 +1,130 @@
+from collections import Counter
+import pygame
+from .view import get_field_layer
+
+# Dirty-rectangle rendering for the Workers & War loops.
+# Frames are drawn onto an offscreen canvas that records every blit. Each frame starts by
+# restoring the cached field under last frame's sprites, and only regions whose blits changed
+# (new/moved/removed sprites, HUD lines with new text) are copied to the window and pushed
+# with display.update(rects).
+
+
+class TrackedSurface(pygame.Surface):
+    """Offscreen canvas that records (what, where) for every blit."""
+
+    def __init__(self, size, like=None):
+        if like is not None:
+            super().__init__(size, 0, like)
+        else:
+            super().__init__(size)
+        self.drawn = []   # list[(key, Rect)]
+        self._pins = []   # keep blit sources alive so their ids stay unique while referenced
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = super().blit(source, dest, area, special_flags)
+        key = (id(source), rect.x, rect.y, rect.w, rect.h, special_flags)
+        self.drawn.append((key, rect))
+        self._pins.append(source)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = [self.blit(*item) for item in blit_sequence]
+        return rects if doreturn else None
+
+    def mark(self, rect, *key):
+        """Record a region drawn by pygame.draw.* (which bypasses blit); key describes its content."""
+        rect = pygame.Rect(rect)
+        self.drawn.append((key + (rect.x, rect.y, rect.w, rect.h), rect))
+
+    def reset(self):
+        drawn, pins = self.drawn, self._pins
+        self.drawn = []
+        self._pins = []
+        return drawn, pins
+
+
+def _changed_rects(prev, cur):
+    """Rects of blits that differ between two frames' (key, rect) lists.
+
+    Keys are compared as multisets (stacking a sprite twice is not the same as once), and
+    since overlapping blits depend on draw order, everything after the first point where the
+    unchanged blits come in a different order is treated as changed too.
+    """
+    prev_count = Counter(k for k, _ in prev)
+    cur_count = Counter(k for k, _ in cur)
+    rects = []
+    stable_prev = []
+    stable_cur = []
+    for k, r in prev:
+        if cur_count[k] != prev_count[k]:
+            rects.append(r)
+        else:
+            stable_prev.append((k, r))
+    for k, r in cur:
+        if cur_count[k] != prev_count[k]:
+            rects.append(r)
+        else:
+            stable_cur.append((k, r))
+    for i, ((kp, _), (kc, _)) in enumerate(zip(stable_prev, stable_cur)):
+        if kp != kc:
+            rects.extend(r for _, r in stable_prev[i:])
+            rects.extend(r for _, r in stable_cur[i:])
+            break
+    return rects
+
+
+class DirtyRenderer:
+    """Draw a frame on begin()'s canvas, then present() pushes only what changed.
+    With a recorder (game.record.FrameRecorder), every presented frame is also captured."""
+
+    # Fall back to a full flip when changes cover this much of the window or need too many rects
+    FULL_AREA_RATIO = 0.5
+    MAX_RECTS = 600
+
+    def __init__(self, screen, recorder=None):
+        self.screen = screen
+        self.recorder = recorder
+        self.canvas = TrackedSurface(screen.get_size(), screen)
+        self._bounds = self.canvas.get_rect()
+        self._background = None
+        self._prev = []
+        self._prev_pins = []
+        self._full = True
+
+    def invalidate(self):
+        """Force the next frame to be restored and pushed in full."""
+        self._full = True
+
+    def begin(self):
+        bg = get_field_layer(self.canvas.get_size())
+        if bg is not self._background:
+            self._background = bg
+            self._full = True
+        if self._full:
+            pygame.Surface.blit(self.canvas, bg, (0, 0))
+        else:
+            pygame.Surface.blits(self.canvas, [(bg, r, r) for _, r in self._prev], doreturn=False)
+        self.canvas.reset()
+        return self.canvas
+
+    def present(self):
+        drawn, pins = self.canvas.reset()
+        if self._full:
+            rects = None
+        else:
+            rects = _changed_rects(self._prev, drawn)
+            rects = [r.clip(self._bounds) for r in rects]
+            rects = [r for r in rects if r.w > 0 and r.h > 0]
+            area = sum(r.w * r.h for r in rects)
+            if len(rects) > self.MAX_RECTS or area > self.FULL_AREA_RATIO * self._bounds.w * self._bounds.h:
+                rects = None
+        if rects is None:
+            self.screen.blit(self.canvas, (0, 0))
+            pygame.display.flip()
+        elif rects:
+            self.screen.blits([(self.canvas, r, r) for r in rects], doreturn=False)
+            pygame.display.update(rects)
+        self._prev, self._prev_pins = drawn, pins
+        self._full = False
+        if self.recorder is not None:
+            self.recorder.capture(self.canvas)
@@ -0,0 +1,321 @@
+"""
+Workers & War replay files: every step's moves plus periodic keyframes, re-simulated on load.
+
+A match is fully determined by its economy and each player's move per step, so that is all a
+replay stores. A move is what a sanitized action actually did: (kind, amount, attack_pct),
+amount being the houses or towers built, workers converted or soldiers sent (after the
+windowed game's garrison cap). Every KEYFRAME_EVERY steps the full counting state is written
+too (workers, soldiers, houses, tower HP, attack %, eliminations), so a loader seeks by
+restoring the nearest keyframe and replaying at most KEYFRAME_EVERY - 1 steps with the
+headless rules (game_multi/headless.py FfaMatch.apply).
+
+  python -m game.replay final.wwr               # header, size and the final standings
+  python -m game.replay final.wwr --at 120      # state after step 120
+
+Recording: pass a ReplayWriter as `replay=` to FfaMatch, run_game or tournament.py --replays.
+Visual state (positions, wander, volleys) is not stored; a viewer lays it out again.
+
+File: b"WWR1", u32 header length, JSON header, then zlib-compressed records:
+  S  step:     count, then per move: player, kind, amount (kind != WAIT), pct (ATTACK)
+  K  keyframe: step, then per player: dead step (0 = alive), workers, soldiers, houses,
+               attack pct, tower count, tower HPs
+Counts are varints (zigzag, low bit set = an 8-byte float follows), so integer economies stay
+at a byte or two per number and fractional ones (sweep.py) still round-trip exactly.
+"""
+
+import struct, sys, time, zlib
+
+from .config import economy
+
+MAGIC = b"WWR1"
+FORMAT = 1
+KEYFRAME_EVERY = 50
+
+# Move kinds
+WAIT, HOUSES, DEFENSES, CONVERT, ATTACK = range(5)
+WAIT_MOVE = (WAIT, 0, 0.0)
+
+# Elimination rules (FfaMatch elimination=...): every step, or only after attacks (windowed 1v1)
+ELIMINATE_ALWAYS = "always"
+ELIMINATE_ON_ATTACK = "attacked"
+
+_KINDS = {"build_houses": HOUSES, "build_defenses": DEFENSES, "convert": CONVERT}
+_DOUBLE = struct.Struct("<d")
+
+
+def to_move(act, send=0):
+    """(kind, amount, attack_pct) for a sanitized action; send: soldiers it sends if it is an attack."""
+    kind = act["kind"]
+    if kind == "attack":
+        return (ATTACK, send, act["attack_pct"])
+    n = act.get(kind, 0) if kind in _KINDS else 0
+    return (_KINDS[kind], n, 0.0) if n > 0 else WAIT_MOVE
+
+
+def move_label(move):
+    """HUD text for a move, as the engines show it."""
+    kind, n, pct = move
+    if kind == HOUSES:
+        return f"Build Houses x{n}"
+    if kind == DEFENSES:
+        return f"Build Defenses x{n}"
+    if kind == CONVERT:
+        return f"Convert {n}"
+    if kind == ATTACK:
+        return f"Attack {int(pct*100)}%"
+    return "Wait"
+
+
+# ----- encoding -----
+def _put_uint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _put_num(out, x):
+    if isinstance(x, int):
+        _put_uint(out, (x * 2 if x >= 0 else -2 * x - 1) << 1)
+    else:
+        _put_uint(out, 1)
+        out += _DOUBLE.pack(x)
+
+
+class _Reader:
+    __slots__ = ("buf", "pos")
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+
+    def uint(self):
+        buf, pos = self.buf, self.pos
+        n = shift = 0
+        while True:
+            b = buf[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                break
+            shift += 7
+        self.pos = pos
+        return n
+
+    def num(self):
+        v = self.uint()
+        if v & 1:
+            return self.double()
+        z = v >> 1
+        return -((z + 1) >> 1) if z & 1 else z >> 1
+
+    def double(self):
+        x, = _DOUBLE.unpack_from(self.buf, self.pos)
+        self.pos += 8
+        return x
+
+    def byte(self):
+        self.pos += 1
+        return self.buf[self.pos - 1]
+
+
+class ReplayWriter:
+    """Collects a match's moves; the engine calls record() after each step, then save() or to_bytes().
+    meta: extra JSON-able header fields (e.g. {"engine": "ww-1v1"})."""
+
+    def __init__(self, keyframe_every=KEYFRAME_EVERY, meta=None):
+        self.keyframe_every = max(1, keyframe_every)
+        self.meta = dict(meta or {})
+        self.steps = 0
+        self.elimination = ELIMINATE_ALWAYS   # the windowed 1v1 sets its own rule
+        self.header = None
+        self._body = bytearray()
+        self._dead = {}
+
+    def record(self, moves, players):
+        """One played step: moves {player index: (kind, amount, pct)}, players after combat."""
+        if self.header is None:
+            ctx = players[0].ctx
+            self.header = {"names": [p.name for p in players], "seed": ctx.seed, "econ": dict(ctx.econ)}
+        self.steps += 1
+        out = self._body
+        out += b"S"
+        _put_uint(out, len(moves))
+        for i, (kind, n, pct) in moves.items():
+            _put_uint(out, i)
+            out.append(kind)
+            if kind != WAIT:
+                _put_num(out, n)
+            if kind == ATTACK:
+                out += _DOUBLE.pack(pct)
+        for i, p in enumerate(players):
+            if p.dead and i not in self._dead:
+                self._dead[i] = self.steps
+        if self.steps % self.keyframe_every == 0:
+            self._keyframe(players)
+
+    def _keyframe(self, players):
+        out = self._body
+        out += b"K"
+        _put_uint(out, self.steps)
+        for i, p in enumerate(players):
+            _put_uint(out, self._dead.get(i, 0))
+            _put_num(out, p.workers)
+            _put_num(out, p.soldiers)
+            _put_num(out, p.houses)
+            out += _DOUBLE.pack(p.attack_pct)
+            towers = p.towers
+            _put_uint(out, len(towers))
+            for t in towers:
+                _put_num(out, t["hp"])
+
+    def to_bytes(self):
+        import json
+        from game_multi.headless import ENGINE_VERSION
+        header = {"format": FORMAT, "rules": ENGINE_VERSION, **(self.header or {}),
+                  "elimination": self.elimination, "keyframe_every": self.keyframe_every,
+                  "steps": self.steps, **self.meta}
+        head = json.dumps(header, separators=(",", ":")).encode()
+        return MAGIC + struct.pack("<I", len(head)) + head + zlib.compress(bytes(self._body), 9)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    """A loaded replay. match_at(step) gives the match after that many steps.
+
+        rp = Replay.load("final.wwr")
+        m = rp.match_at(rp.steps)
+        print([(p.name, p.workers) for p in m.players])
+    """
+
+    def __init__(self, data):
+        if data[:4] != MAGIC:
+            raise ValueError("not a Workers & War replay")
+        import json
+        hlen, = struct.unpack_from("<I", data, 4)
+        self.header = json.loads(data[8:8 + hlen])
+        if self.header.get("format") != FORMAT:
+            raise ValueError(f"unsupported replay format {self.header.get('format')}")
+        from game_multi.headless import ENGINE_VERSION
+        if self.header.get("rules") != ENGINE_VERSION:
+            print(f"[WARN] replay recorded with rules v{self.header.get('rules')}, "
+                  f"re-simulating with v{ENGINE_VERSION}", file=sys.stderr)
+        self.names = self.header["names"]
+        # Files from before an economy constant existed get its default
+        self.econ = economy(**self.header["econ"])
+        self.seed = self.header.get("seed")
+        self.keyframe_every = self.header["keyframe_every"]
+        self.elimination = self.header.get("elimination", ELIMINATE_ALWAYS)
+        self.moves = []        # per step (index = step - 1): {player: (kind, amount, pct)}
+        self.keyframes = {}    # step -> per-player (dead_at, workers, soldiers, houses, pct, tower hps)
+        self._parse(zlib.decompress(data[8 + hlen:]))
+        self.steps = len(self.moves)
+        self._match = None
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def _parse(self, body):
+        r = _Reader(body)
+        n_players = len(self.names)
+        while r.pos < len(body):
+            tag = r.byte()
+            if tag == ord("S"):
+                moves = {}
+                for _ in range(r.uint()):
+                    i = r.uint()
+                    kind = r.byte()
+                    n = r.num() if kind != WAIT else 0
+                    moves[i] = (kind, n, r.double() if kind == ATTACK else 0.0)
+                self.moves.append(moves)
+            elif tag == ord("K"):
+                step = r.uint()
+                rows = []
+                for _ in range(n_players):
+                    dead_at, workers, soldiers, houses = r.uint(), r.num(), r.num(), r.num()
+                    pct = r.double()
+                    hps = [r.num() for _ in range(r.uint())]
+                    rows.append((dead_at, workers, soldiers, houses, pct, hps))
+                self.keyframes[step] = rows
+            else:
+                raise ValueError(f"corrupt replay: record {tag!r} at byte {r.pos - 1}")
+
+    def _fresh(self):
+        from game.context import MatchContext
+        from game_multi.headless import FfaMatch
+        # No bots: moves come from the file. Seedless, so loading doesn't reseed `random`.
+        return FfaMatch([None] * len(self.names), names=self.names, ctx=MatchContext(econ=self.econ),
+                        elimination=self.elimination)
+
+    def _restore(self, step):
+        m = self._fresh()
+        eliminated = []
+        for i, (dead_at, workers, soldiers, houses, pct, hps) in enumerate(self.keyframes[step]):
+            p = m.players[i]
+            p.workers, p.soldiers, p.houses, p.attack_pct = workers, soldiers, houses, pct
+            p.towers = [{"hp": hp} for hp in hps]
+            p.defenses = len(hps)
+            # Eliminated players keep the label of their last move
+            p.last_action = move_label(self.moves[(dead_at or step) - 1].get(i, WAIT_MOVE))
+            if dead_at:
+                p.dead = True
+                eliminated.append((dead_at, i))
+        eliminated.sort()
+        m.eliminated = eliminated
+        gone = {i for _, i in eliminated}
+        m.alive = [i for i in range(len(m.players)) if i not in gone]
+        m.step_nr = step + 1
+        return m
+
+    def match_at(self, step):
+        """The match (a headless FfaMatch) after `step` steps, 0 <= step <= steps. Seeks from the nearest
+        keyframe at or before `step`, or keeps going from the previous call when that is closer.
+        The returned match is reused by later calls; read it, don't step it."""
+        step = max(0, min(step, self.steps))
+        kf = max((k for k in self.keyframes if k <= step), default=0)
+        m = self._match
+        if m is None or not (kf <= m.step_nr - 1 <= step):
+            m = self._restore(kf) if kf else self._fresh()
+        while m.step_nr - 1 < step:
+            m.spawn()
+            m.apply(self.moves[m.step_nr - 1])
+        self._match = m
+        return m
+
+
+def main(argv=None):
+    # argparse and json are imported where used: every headless engine imports this module
+    # for the move kinds, and together they are most of its startup (benchmarks/startup.py)
+    import argparse
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path")
+    ap.add_argument("--at", type=int, default=None, help="show the state after this step (default: the last)")
+    args = ap.parse_args(argv)
+
+    import game_multi.headless  # noqa: F401  (imported up front so the timings below are the replay's own)
+    with open(args.path, "rb") as f:
+        data = f.read()
+    t = time.perf_counter()
+    rp = Replay(data)
+    loaded = time.perf_counter() - t
+    step = rp.steps if args.at is None else args.at
+    t = time.perf_counter()
+    m = rp.match_at(step)
+    seek = time.perf_counter() - t
+    meta = {k: v for k, v in rp.header.items() if k not in ("names", "econ")}
+    print(f"{args.path}: {len(data)} bytes, {rp.steps} steps, {len(rp.keyframes)} keyframes  {meta}")
+    print(f"load {loaded*1000:.2f} ms, seek to step {m.step_nr - 1} {seek*1000:.2f} ms")
+    print(f"  {'player':<24} {'workers':>9} {'soldiers':>9} {'houses':>7} {'towers':>7}  last")
+    for i, p in enumerate(m.players):
+        state = "out" if p.dead else p.last_action
+        print(f"  {p.name:<24} {p.workers:>9} {p.soldiers:>9} {p.houses:>7} {len(p.towers):>7}  {state}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
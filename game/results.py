@@ -0,0 +1,188 @@
+import os, json, hashlib, types
+
+from .cache import cache_dir, atomic_write
+
+# Content-addressed match results, shared by the TRON and Workers & War tournament runners.
+# A result is keyed by everything that determines it: the engine (name + version), each bot's
+# normalized bytecode (including the helper functions and classes it calls and the tables,
+# constants and module attributes it reads), the engine's config constants and
+# the seed. Editing one bot only invalidates that bot's pairings. Unseeded matches are random
+# and never cached. Files live in cache_dir('results') and the least recently used ones are
+# evicted once the directory grows past max_bytes.
+
+RESULTS_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _code_parts(code, out, seen, glb):
+    """Append the position-independent parts of a code object (no line numbers or filenames)."""
+    out.append(code.co_code)
+    out.append(repr((code.co_names, code.co_varnames, code.co_freevars, code.co_cellvars,
+                     code.co_argcount, code.co_kwonlyargcount, code.co_flags)).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_parts(const, out, seen, glb)
+        else:
+            out.append(repr(const).encode())
+    # Helper functions, classes, tables and modules the bot reads from its module
+    for name in code.co_names:
+        if name in glb and (id(glb), name) not in seen:
+            seen.add((id(glb), name))
+            _global_parts(name, glb[name], code, out, seen)
+
+
+def _global_parts(name, val, code, out, seen):
+    """Append what a global the code reads contributes: code for functions and class members,
+    the module attributes the code looks up, the value of data."""
+    if isinstance(val, types.FunctionType):
+        out.append(f"fn:{name}".encode())
+        _code_parts(val.__code__, out, seen, val.__globals__)
+        if val.__defaults__:
+            out.append(repr(val.__defaults__).encode())
+    elif isinstance(val, type):
+        out.append(f"cls:{name}".encode())
+        if ("cls", id(val)) in seen or val.__module__ == "builtins":
+            return
+        seen.add(("cls", id(val)))
+        for klass in val.__mro__:
+            if klass.__module__ == "builtins":
+                continue
+            for attr, member in sorted(vars(klass).items()):
+                if isinstance(member, (staticmethod, classmethod)):
+                    member = member.__func__
+                if isinstance(member, property):
+                    for acc in (member.fget, member.fset, member.fdel):
+                        if acc is not None:
+                            _global_parts(f"{name}.{attr}", acc, code, out, seen)
+                elif isinstance(member, types.FunctionType) or not attr.startswith("__"):
+                    _global_parts(f"{name}.{attr}", member, code, out, seen)
+    elif isinstance(val, types.ModuleType):
+        out.append(f"mod:{name}={val.__name__}".encode())
+        attrs = vars(val)
+        for attr in code.co_names:
+            if attr in attrs and (id(attrs), attr) not in seen:
+                seen.add((id(attrs), attr))
+                _global_parts(f"{name}.{attr}", attrs[attr], code, out, seen)
+    elif _plain(val):
+        out.append(f"{name}={val!r}".encode())
+    elif isinstance(val, (set, frozenset)) and _plain(list(val)):
+        out.append(f"{name}={sorted(map(repr, val))!r}".encode())
+    else:
+        # Other objects have no stable content to hash (their repr holds addresses); their type does
+        out.append(f"{name}:{type(val).__module__}.{type(val).__qualname__}".encode())
+
+
+def bot_fingerprint(fn):
+    """Hash of a bot's behaviour-relevant code; unchanged by moving it or editing comments."""
+    parts = []
+    _code_parts(fn.__code__, parts, set(), fn.__globals__)
+    if fn.__defaults__:
+        parts.append(repr(fn.__defaults__).encode())
+    return hashlib.sha256(b"\0".join(parts)).hexdigest()
+
+
+def _plain(v):
+    if isinstance(v, (int, float, str, bool)) or v is None:
+        return True
+    if isinstance(v, (tuple, list)):
+        return all(_plain(x) for x in v)
+    if isinstance(v, dict):
+        return all(_plain(k) and _plain(x) for k, x in v.items())
+    return False
+
+
+def config_fingerprint(module):
+    """Hash of a module's UPPER_CASE data constants (e.g. game.config, tron.main)."""
+    consts = sorted((k, repr(v)) for k, v in vars(module).items() if k.isupper() and _plain(v))
+    return hashlib.sha256(repr(consts).encode()).hexdigest()
+
+
+def match_key(engine, bots, config, seed):
+    """Cache key for one match, or None if the match is not reproducible (seed is None)."""
+    if seed is None:
+        return None
+    h = hashlib.sha256()
+    h.update(repr((engine, config, seed)).encode())
+    for fn in bots:
+        h.update(bot_fingerprint(fn).encode())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """JSON results on disk, one file per key, with LRU eviction by file mtime."""
+
+    def __init__(self, path=None, max_bytes=RESULTS_MAX_BYTES):
+        self.path = path or cache_dir("results")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+    def _load(self, key):
+        if key is None or self.path is None:
+            return None
+        fp = self._file(key)
+        try:
+            with open(fp) as f:
+                entry = json.load(f)
+            os.utime(fp)   # mark as recently used
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and "result" in entry else None
+
+    def get(self, key, default=None):
+        entry = self._load(key)
+        return default if entry is None else entry["result"]
+
+    def put(self, key, result):
+        if key is None or self.path is None:
+            return
+        data = json.dumps({"result": result}).encode()
+        fp = self._file(key)
+        try:
+            old = os.path.getsize(fp)
+        except OSError:
+            old = 0
+        if atomic_write(fp, data):
+            self._size = None if self._size is None else self._size + len(data) - old
+            self._evict()
+
+    def run(self, key, play):
+        """Return the cached result for key, or call play() and cache what it returns."""
+        entry = self._load(key)
+        if entry is not None:
+            self.hits += 1
+            return entry["result"]
+        self.misses += 1
+        result = play()
+        self.put(key, result)
+        return result
+
+    def _entries(self):
+        out = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, name))
+        return out
+
+    def _evict(self):
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        if self._size <= self.max_bytes:
+            return
+        # Drop least recently used entries down to 90% of the budget
+        for _, size, name in sorted(self._entries()):
+            if self._size <= 0.9 * self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+                self._size -= size
+            except OSError:
+                pass
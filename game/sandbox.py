@@ -0,0 +1,141 @@
+import signal
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from .config import BOT_TIMEOUT
+from .botcall import isawaitable
+
+# Out-of-process bots. Each bot runs in its own long-lived worker process; a call writes the
+# bot's view into a shared-memory block (fixed layout, packed by a per-engine codec), wakes
+# the worker over a pipe and waits for the pickled action. A bot that crashes the worker or
+# misses its deadline has its process killed and restarted (losing any module state it kept),
+# and the call raises, so the engines fall back to their usual default action.
+#
+# Codec: any object with `size` (bytes), `pack(view, buf)` and `unpack(buf) -> view`; see
+# tron.main.STATE_CODEC and game.model.BOT_VIEW_CODEC.
+
+
+class BotTimeout(RuntimeError):
+    pass
+
+
+class BotCrashed(RuntimeError):
+    pass
+
+
+def _serve(fn, codec, shm, conn):
+    # Worker loop: one decision per wake-up byte, until the pipe closes
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    buf = shm.buf
+    loop = None
+    while True:
+        try:
+            conn.recv_bytes()
+        except (EOFError, OSError):
+            break
+        try:
+            act = fn(codec.unpack(buf))
+            if isawaitable(act):
+                # async def bot: the worker has a loop of its own, kept across steps
+                if loop is None:
+                    import asyncio
+                    loop = asyncio.new_event_loop()
+                act = loop.run_until_complete(act)
+            reply = (True, act)
+        except Exception as e:
+            reply = (False, f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable action: report it instead of leaving the engine waiting
+            conn.send((False, f"bad action: {e}"))
+
+
+class SandboxedBot:
+    """Callable stand-in for a bot function that runs it in a worker process."""
+
+    def __init__(self, fn, codec, timeout=BOT_TIMEOUT, mp_context=None):
+        self.fn = fn
+        self.codec = codec
+        self.timeout = timeout
+        self.__name__ = getattr(fn, "__name__", "bot")
+        self.restarts = 0
+        self._mp = mp_context or mp.get_context()
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, codec.size))
+        self._proc = None
+        self._conn = None
+        self._start()
+
+    def _start(self):
+        parent, child = self._mp.Pipe()
+        self._proc = self._mp.Process(target=_serve, args=(self.fn, self.codec, self._shm, child),
+                                      name=f"bot:{self.__name__}", daemon=True)
+        self._proc.start()
+        child.close()
+        self._conn = parent
+
+    def _kill(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._proc is not None:
+            if self._proc.is_alive():
+                self._proc.kill()
+            self._proc.join()
+            self._proc = None
+
+    def restart(self):
+        self._kill()
+        self.restarts += 1
+        self._start()
+
+    def __call__(self, view):
+        if self._proc is None:
+            self._start()
+        self.codec.pack(view, self._shm.buf)
+        try:
+            self._conn.send_bytes(b"\0")
+            if not self._conn.poll(self.timeout):
+                self.restart()
+                raise BotTimeout(f"no decision within {self.timeout:g}s (worker restarted)")
+            ok, result = self._conn.recv()
+        except (EOFError, OSError, BrokenPipeError):
+            self.restart()
+            raise BotCrashed("worker died (restarted)") from None
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def close(self):
+        self._kill()
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class BotPool:
+    """One SandboxedBot per bot function; use as a context manager so workers are reaped.
+
+        with BotPool(bots, STATE_CODEC) as pool:
+            run_match(pool.bots)
+    """
+
+    def __init__(self, bots, codec, timeout=BOT_TIMEOUT):
+        self.bots = []
+        try:
+            for fn in bots:
+                self.bots.append(SandboxedBot(fn, codec, timeout))
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        for bot in self.bots:
+            bot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
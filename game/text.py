@@ -0,0 +1,42 @@
+from collections import OrderedDict
+import pygame
+
+# Shared font registry and rendered-text cache for all HUDs.
+# SysFont scans the system font list on every call, so fonts are created once per size;
+# rendered lines are kept in a small LRU so only text that actually changed is re-rasterized.
+
+_FONTS = {}
+_TEXT_CACHE = OrderedDict()
+TEXT_CACHE_SIZE = 512
+
+
+def get_font(size, name=None):
+    """Return a shared SysFont for (name, size), creating it on first use."""
+    key = (name, size)
+    font = _FONTS.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size)
+        _FONTS[key] = font
+    return font
+
+
+def render_text(font, text, color, antialias=True):
+    """Render text with font, reusing the surface from the last time the same line was drawn."""
+    key = (font, text, tuple(color), antialias)
+    img = _TEXT_CACHE.get(key)
+    if img is not None:
+        _TEXT_CACHE.move_to_end(key)
+        return img
+    img = font.render(text, antialias, color)
+    _TEXT_CACHE[key] = img
+    if len(_TEXT_CACHE) > TEXT_CACHE_SIZE:
+        _TEXT_CACHE.popitem(last=False)
+    return img
+
+
+def clear_text_cache():
+    """Drop cached fonts and text surfaces (e.g. after pygame.quit())."""
+    _TEXT_CACHE.clear()
+    _FONTS.clear()
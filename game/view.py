@@ -1,9 +1,10 @@
-import math, random, os, time
+import math, random, os
+import numpy as np
 import pygame
-from .config import WIDTH, HEIGHT, FIELD_MARGIN, GREEN, BROWN, PINK, GREY, WHITE, BASE_WORKERS_PER_STEP, HOUSE_WORKER_BONUS, WORKER_SIZE, SOLDIER_SIZE, HOUSE_SIZE, TOWER_SIZE, GRASS_SIZE, TREE_SIZE, BOULDER_SIZE, SEED, DEFENSE_HEALTH, WINDOW_SCALE
-
-# Dedicated RNG for visuals to avoid influencing gameplay RNG under TIME_SCALE
-VIS_RNG = random.Random(SEED if SEED is not None else 13579)
+from .atlas import get_atlas
+from .cache import cache_dir, atomic_write
+from .text import get_font, render_text
+from .config import WIDTH, HEIGHT, FIELD_MARGIN, GREEN, BROWN, PINK, GREY, WHITE, SEED
 
 
 def tri_points(cx, cy, size, facing_right=True):
@@ -12,64 +13,34 @@ def tri_points(cx, cy, size, facing_right=True):
     else:
         return [(cx-size, cy), (cx+size, cy-size), (cx+size, cy+size)]
 
-# Sprite loading and orientation
-_IMG_CACHE = {}
-
-def _load_base(name):
-    key = ("base", name)
-    if key in _IMG_CACHE:
-        return _IMG_CACHE[key]
-    path = os.path.join(os.path.dirname(__file__), name)
-    img = pygame.image.load(path).convert_alpha()
-    _IMG_CACHE[key] = img
-    return img
+def mark_dirty(surface, rect, *key):
+    """Report a pygame.draw region to dirty-rect canvases (see game.render); no-op otherwise."""
+    mark = getattr(surface, 'mark', None)
+    if mark is not None:
+        mark(rect, *key)
 
+# Sprites come from one atlas per WINDOW_SCALE and sprite-size config (game.atlas)
 def get_image(kind: str, side: str):
-    """Return oriented image for kind in {worker,soldier,house,tower} and side 'L' or 'R'."""
-    filename = {
-        'worker': 'worker.png',
-        'soldier': 'soldier.png',
-        'house': 'house.png',
-        'tower': 'tower.png',
-        'grass': 'grass.png',
-        'tree':  'tree.png',
-        'boulder': 'boulder.png',
-    }[kind]
-    key = (kind, side)
-    if key in _IMG_CACHE:
-        return _IMG_CACHE[key]
-    base = _load_base(filename)
-    # Scale to target size (height-based)
-    base_h = {
-        'worker': WORKER_SIZE,
-        'soldier': SOLDIER_SIZE,
-        'house': HOUSE_SIZE,
-        'tower': TOWER_SIZE,
-        'grass': GRASS_SIZE,
-        'tree':  TREE_SIZE,
-        'boulder': BOULDER_SIZE,
-    }[kind]
-    target_h = max(1, int(round(base_h * WINDOW_SCALE)))
-    if base.get_height() != target_h:
-        aspect = base.get_width() / max(1, base.get_height())
-        target_w = max(1, int(round(target_h * aspect)))
-        base_scaled = pygame.transform.smoothscale(base, (target_w, target_h))
-    else:
-        base_scaled = base
-    if side == 'R' and kind in ('worker','soldier','house','tower'):
-        img = pygame.transform.flip(base_scaled, True, False)
-    else:
-        img = base_scaled
-    _IMG_CACHE[key] = img
-    return img
+    """Return oriented image for kind in {worker,soldier,house,tower,grass,tree,boulder} and side 'L' or 'R'."""
+    return get_atlas().get(kind, side)
 
 
-def draw_base(surface, player, dt: float):
+def get_scaled_image(kind: str, side: str, w: int, h: int):
+    """The oriented image at w x h (spawn scale-in sizes are pre-scaled in the atlas)."""
+    return get_atlas().scaled(kind, side, w, h)
+
+
+def draw_base(surface, player, dt: float, wander=True, max_workers=None):
+    """Draw one player's towers, workers, soldiers and houses, advancing their motion by dt.
+    wander=False skips worker motion (wander, ingress and build tasks): new workers appear in
+    place and the rest stand still, for fast playback where per-worker steering isn't seen.
+    max_workers: draw at most this many worker sprites (None = one per worker)."""
     # Defenses: draw towers at stored positions (dicts: x,y,hp), with spawn scale-in
     player.defenses = len(player._defense_positions)
     tower_img = get_image('tower', player.side)
     tw, th = tower_img.get_width(), tower_img.get_height()
-    now = time.time()
+    now = player.ctx.clock.now()
+    max_hp = player.ctx.econ['DEFENSE_HEALTH']
     for t in player._defense_positions:
         tx, ty = int(t['x']), int(t['y'])
         # Check recent spawn for scale-in (0.15s from 0.9->1.0)
@@ -83,22 +54,22 @@ def draw_base(surface, player, dt: float):
                     break
         if scale != 1.0:
             sw = max(1, int(tw * scale)); sh = max(1, int(th * scale))
-            simg = pygame.transform.smoothscale(tower_img, (sw, sh))
+            simg = get_scaled_image('tower', player.side, sw, sh)
             surface.blit(simg, (tx - sw//2, ty - sh//2))
         else:
             surface.blit(tower_img, (tx - tw//2, ty - th//2))
         # Small HP bar above tower
         try:
-            hp = max(0, min(DEFENSE_HEALTH, int(t.get('hp', DEFENSE_HEALTH))))
+            hp = max(0, min(max_hp, int(t.get('hp', max_hp))))
         except Exception:
-            hp = DEFENSE_HEALTH
-        ratio = hp / max(1, DEFENSE_HEALTH)
+            hp = max_hp
+        ratio = hp / max(1, max_hp)
         bar_w = max(12, tw)
         bar_h = 3
         bx = tx - bar_w//2
         by = ty - th//2 - 6
         # background
-        pygame.draw.rect(surface, (40,40,40), pygame.Rect(bx, by, bar_w, bar_h))
+        mark_dirty(surface, pygame.draw.rect(surface, (40,40,40), pygame.Rect(bx, by, bar_w, bar_h)), 'bar')
         # foreground color from red->yellow->green
         if ratio < 0.33:
             col = (200, 40, 40)
@@ -106,11 +77,11 @@ def draw_base(surface, player, dt: float):
             col = (220, 180, 40)
         else:
             col = (50, 200, 70)
-        pygame.draw.rect(surface, col, pygame.Rect(bx, by, int(bar_w * ratio), bar_h))
+        mark_dirty(surface, pygame.draw.rect(surface, col, pygame.Rect(bx, by, int(bar_w * ratio), bar_h)), 'bar', col)
 
     # Building spawn bursts (same flavor as tower destruction rings)
     if getattr(player, '_spawn_bursts', None):
-        now = time.time()
+        now = player.ctx.clock.now()
         keep = []
         for b in player._spawn_bursts:
             tleft = b.get('until', 0) - now
@@ -133,14 +104,28 @@ def draw_base(surface, player, dt: float):
 
     # Workers: pink dots, gentle continuous wandering around base
     wr = 4
+    rng = player.ctx.vis_rng
     # Keep consuming workers visible until they finish/exit, so count them too
     consuming = sum(1 for t in getattr(player, '_worker_tasks', []) if t.get('consume'))
     need = player.workers + consuming
+    if max_workers is not None:
+        need = min(need, max_workers)
     # Ensure we have stable positions matching current shown worker count
     cx = player.base_x + (40 if player.side=="L" else -40)
     cy = player.base_y
     # Grow new workers from off-screen; shrink by truncating
-    if len(player._worker_positions) < need:
+    if not wander:
+        have = len(player._worker_positions)
+        if have < need:
+            left, right = player._side_bounds()
+            v_margin = int(HEIGHT * 0.10)
+            player._worker_positions += [(rng.uniform(left + 10, right - 10), rng.uniform(v_margin, HEIGHT - v_margin))
+                                         for _ in range(need - have)]
+            player._worker_vels += [(0.0, 0.0)] * (need - have)
+        elif have > need:
+            del player._worker_positions[need:]
+            del player._worker_vels[need:]
+    elif len(player._worker_positions) < need:
         add = need - len(player._worker_positions)
         for _ in range(add):
             # In multi-player, allow ingress from nearest edge to the base area
@@ -152,28 +137,28 @@ def draw_base(surface, player, dt: float):
                 d_bottom = HEIGHT - by
                 dm = min(d_left, d_right, d_top, d_bottom)
                 if dm == d_left:
-                    x = VIS_RNG.randint(-60, -20)
-                    y = int(by) + VIS_RNG.randint(-140, 140)
+                    x = rng.randint(-60, -20)
+                    y = int(by) + rng.randint(-140, 140)
                 elif dm == d_right:
-                    x = VIS_RNG.randint(WIDTH+20, WIDTH+60)
-                    y = int(by) + VIS_RNG.randint(-140, 140)
+                    x = rng.randint(WIDTH+20, WIDTH+60)
+                    y = int(by) + rng.randint(-140, 140)
                 elif dm == d_top:
-                    x = int(bx) + VIS_RNG.randint(-140, 140)
-                    y = VIS_RNG.randint(-50, -20)
+                    x = int(bx) + rng.randint(-140, 140)
+                    y = rng.randint(-50, -20)
                 else:
-                    x = int(bx) + VIS_RNG.randint(-140, 140)
-                    y = VIS_RNG.randint(HEIGHT+20, HEIGHT+60)
+                    x = int(bx) + rng.randint(-140, 140)
+                    y = rng.randint(HEIGHT+20, HEIGHT+60)
             else:
                 if player.side == "L":
-                    x = VIS_RNG.randint(-50, -10)
+                    x = rng.randint(-50, -10)
                 else:
-                    x = VIS_RNG.randint(WIDTH+10, WIDTH+50)
+                    x = rng.randint(WIDTH+10, WIDTH+50)
                 # Ingress from around base Y but allow ~80% window height spread
-                y = int(cy + VIS_RNG.randint(int(-HEIGHT*0.40), int(HEIGHT*0.40)))
+                y = int(cy + rng.randint(int(-HEIGHT*0.40), int(HEIGHT*0.40)))
             player._worker_positions.append((float(x), float(y)))
             dx = cx - x; dy = cy - y
             dist = math.hypot(dx, dy) + 1e-6
-            spd = VIS_RNG.uniform(120.0, 200.0)
+            spd = rng.uniform(120.0, 200.0)
             player._worker_vels.append((dx/dist*spd, dy/dist*spd))
     elif len(player._worker_positions) > need:
         # Avoid shrinking while there are consuming tasks to preserve identity illusion
@@ -181,7 +166,7 @@ def draw_base(surface, player, dt: float):
             player._worker_positions = player._worker_positions[:need]
             player._worker_vels = player._worker_vels[:need]
 
-    if need:
+    if need and wander:
         # Rectangular roam area
         if getattr(player, '_multi_roam_tight', False):
             # Tight leash around base in multi-player mode
@@ -205,10 +190,10 @@ def draw_base(surface, player, dt: float):
             player._worker_anchor_ttls = []
         # Resize anchors to match positions length
         while len(player._worker_anchors) < len(player._worker_positions):
-            ax = random.uniform(left+10, right-10)
-            ay = random.uniform(top, bottom)
+            ax = rng.uniform(left+10, right-10)
+            ay = rng.uniform(top, bottom)
             player._worker_anchors.append((ax, ay))
-            player._worker_anchor_ttls.append(random.uniform(4.0, 9.0))
+            player._worker_anchor_ttls.append(rng.uniform(4.0, 9.0))
         if len(player._worker_anchors) > len(player._worker_positions):
             player._worker_anchors = player._worker_anchors[:len(player._worker_positions)]
             player._worker_anchor_ttls = player._worker_anchor_ttls[:len(player._worker_positions)]
@@ -221,9 +206,9 @@ def draw_base(surface, player, dt: float):
             ttl = new_ttls[idx] - dt
             ax, ay = new_anchors[idx]
             if ttl <= 0 or not (left+10 <= ax <= right-10 and top <= ay <= bottom):
-                ax = random.uniform(left+10, right-10)
-                ay = random.uniform(top, bottom)
-                ttl = random.uniform(4.0, 9.0)
+                ax = rng.uniform(left+10, right-10)
+                ay = rng.uniform(top, bottom)
+                ttl = rng.uniform(4.0, 9.0)
                 new_anchors[idx] = (ax, ay)
             new_ttls[idx] = ttl
             # Ornstein–Uhlenbeck style Brownian motion with gentle bias toward base
@@ -235,8 +220,8 @@ def draw_base(surface, player, dt: float):
             vy += bias * (ay - y) * dt
             # Gaussian noise term (Brownian component)
             sigma = 44.0  # px / sqrt(s)
-            vx += random.gauss(0.0, sigma) * math.sqrt(max(1e-6, dt))
-            vy += random.gauss(0.0, sigma) * math.sqrt(max(1e-6, dt))
+            vx += rng.gauss(0.0, sigma) * math.sqrt(max(1e-6, dt))
+            vy += rng.gauss(0.0, sigma) * math.sqrt(max(1e-6, dt))
             # Speed clamp
             speed = math.hypot(vx, vy)
             max_s = 90.0
@@ -399,7 +384,7 @@ def draw_base(surface, player, dt: float):
                     break
         if scale != 1.0:
             sw = max(1, int(hw * scale)); sh = max(1, int(hh * scale))
-            simg = pygame.transform.smoothscale(house_img, (sw, sh))
+            simg = get_scaled_image('house', player.side, sw, sh)
             surface.blit(simg, (int(hx) - sw//2, int(hy) - sh//2))
         else:
             surface.blit(house_img, (int(hx) - hw//2, int(hy) - hh//2))
@@ -409,64 +394,79 @@ def draw_base(surface, player, dt: float):
 
 _DECOR = None
 _NOISE_SURF = None
+_FIELD_LAYER = None
 
-def _smoothstep(t: float) -> float:
+# Background noise parameters (part of the on-disk cache key)
+NOISE_OCTAVES = 3
+NOISE_BASE_FREQ = 12
+NOISE_MAX_ALPHA = 30
+
+def _smoothstep(t):
     return t * t * (3.0 - 2.0 * t)
 
-def _value_noise(x: float, y: float, grid, gw: int, gh: int):
-    # x,y in [0,1]; grid is gw x gh of random values
-    xf = x * (gw - 1)
-    yf = y * (gh - 1)
-    x0 = int(xf)
-    y0 = int(yf)
-    x1 = min(x0 + 1, gw - 1)
-    y1 = min(y0 + 1, gh - 1)
-    tx = _smoothstep(xf - x0)
-    ty = _smoothstep(yf - y0)
-    v00 = grid[y0][x0]
-    v10 = grid[y0][x1]
-    v01 = grid[y1][x0]
-    v11 = grid[y1][x1]
+def _value_noise(nx, ny, grid):
+    # nx (NX,), ny (NY,) in [0,1]; grid is a (gh, gw) array of random values
+    gh, gw = grid.shape
+    xf = nx * (gw - 1)
+    yf = ny * (gh - 1)
+    x0 = xf.astype(np.intp)
+    y0 = yf.astype(np.intp)
+    x1 = np.minimum(x0 + 1, gw - 1)
+    y1 = np.minimum(y0 + 1, gh - 1)
+    tx = _smoothstep(xf - x0)[None, :]
+    ty = _smoothstep(yf - y0)[:, None]
+    v00 = grid[y0[:, None], x0[None, :]]
+    v10 = grid[y0[:, None], x1[None, :]]
+    v01 = grid[y1[:, None], x0[None, :]]
+    v11 = grid[y1[:, None], x1[None, :]]
     a = v00 * (1 - tx) + v10 * tx
     b = v01 * (1 - tx) + v11 * tx
     return a * (1 - ty) + b * ty
 
+def _noise_alpha(NX, NY):
+    """Low-res (NY, NX) uint8 alpha map of the background noise."""
+    rng = random.Random(SEED if SEED is not None else None)
+    nx = np.arange(NX) / max(1, NX - 1)
+    ny = np.arange(NY) / max(1, NY - 1)
+    val = np.zeros((NY, NX))
+    amp = 1.0
+    norm = 0.0
+    for o in range(NOISE_OCTAVES):
+        freq = int(NOISE_BASE_FREQ * (2 ** o))
+        gw = max(2, int(freq))
+        gh = max(2, int(freq * NY / NX))
+        rng.seed((o+1) * 9176)
+        grid = np.array([[rng.random() for _ in range(gw)] for __ in range(gh)])
+        val += _value_noise(nx, ny, grid) * amp
+        norm += amp
+        amp *= 0.5
+    v = val / max(1e-6, norm)
+    return np.clip((v - 0.5) * 2.0 * NOISE_MAX_ALPHA, 0, NOISE_MAX_ALPHA).astype(np.uint8)
+
 def _init_noise_surface():
     global _NOISE_SURF
-    rng = random.Random(SEED if SEED is not None else None)
     # Compute low-res noise then upscale for performance
     NX = max(64, WIDTH // 6)
     NY = max(64, HEIGHT // 6)
+    # The noise only depends on these inputs, so the low-res alpha map is cached on disk
+    name = f"noise_{WIDTH}x{HEIGHT}_{SEED}_{NOISE_OCTAVES}_{NOISE_BASE_FREQ}_{NOISE_MAX_ALPHA}.raw"
+    folder = cache_dir("noise")
+    path = os.path.join(folder, name) if folder else None
+    alpha = None
+    if path and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) == NX * NY:
+                alpha = np.frombuffer(data, dtype=np.uint8).reshape(NY, NX)
+        except OSError:
+            alpha = None
+    if alpha is None:
+        alpha = _noise_alpha(NX, NY)
+        if path:
+            atomic_write(path, alpha.tobytes())
     small = pygame.Surface((NX, NY), flags=pygame.SRCALPHA)
-    octaves = 3
-    base_freq = 12
-    max_alpha = 30
-    # Precompute grids per octave once
-    grids = []
-    freqs = []
-    for o in range(octaves):
-        freq = int(base_freq * (2 ** o))
-        gw = max(2, int(freq))
-        gh = max(2, int(freq * NY / NX))
-        rng.seed((o+1) * 9176)
-        grid = [[rng.random() for _ in range(gw)] for __ in range(gh)]
-        grids.append((grid, gw, gh))
-        freqs.append(freq)
-    for y in range(NY):
-        for x in range(NX):
-            nx = x / max(1, NX - 1)
-            ny = y / max(1, NY - 1)
-            amp = 1.0
-            val = 0.0
-            norm = 0.0
-            for (grid, gw, gh) in grids:
-                val += _value_noise(nx, ny, grid, gw, gh) * amp
-                norm += amp
-                amp *= 0.5
-            v = val / max(1e-6, norm)
-            a = int(max(0, min(max_alpha, (v - 0.5) * 2.0 * max_alpha)))
-            if a > 0:
-                small.set_at((x, y), (0, 0, 0, a))
+    pygame.surfarray.pixels_alpha(small)[:] = alpha.T
     _NOISE_SURF = pygame.transform.smoothscale(small, (WIDTH, HEIGHT))
 
 def _init_decor():
@@ -485,51 +485,72 @@ def _init_decor():
     boulders = [(rng.randint(xmin, xmax), rng.randint(ymin, ymax)) for _ in range(int(n_boulders))]
     _DECOR = { 'grass': grass, 'trees': trees, 'boulders': boulders }
 
-def draw_field(surface):
-    surface.fill(GREEN)
-    # Scatter background decor
+def _compose_field():
+    """Render the static field (grass colour, noise overlay, decor) into one surface."""
     global _DECOR
     global _NOISE_SURF
     if _DECOR is None:
         _init_decor()
     if _NOISE_SURF is None:
         _init_noise_surface()
-    # Darken with subtle noise overlay
+    layer = pygame.Surface((WIDTH, HEIGHT))
+    layer.fill(GREEN)
+    # Darken with subtle noise overlay (applied twice for a stronger texture)
     if _NOISE_SURF is not None:
-        surface.blit(_NOISE_SURF, (0, 0))
+        layer.blit(_NOISE_SURF, (0, 0))
+        layer.blit(_NOISE_SURF, (0, 0))
     gimg = get_image('grass', 'L')
     timg = get_image('tree', 'L')
     bimg = get_image('boulder', 'L')
     gw, gh = gimg.get_width(), gimg.get_height()
     tw, th = timg.get_width(), timg.get_height()
     bw, bh = bimg.get_width(), bimg.get_height()
-    # Static noise overlay
-    if _NOISE_SURF is not None:
-        surface.blit(_NOISE_SURF, (0, 0))
     # Static decor
     for (x, y) in _DECOR['grass']:
-        surface.blit(gimg, (x - gw//2, y - gh//2))
+        layer.blit(gimg, (x - gw//2, y - gh//2))
     for (x, y) in _DECOR['trees']:
-        surface.blit(timg, (x - tw//2, y - th//2))
+        layer.blit(timg, (x - tw//2, y - th//2))
     for (x, y) in _DECOR.get('boulders', []):
-        surface.blit(bimg, (x - bw//2, y - bh//2))
+        layer.blit(bimg, (x - bw//2, y - bh//2))
+    return layer
+
+
+def get_field_layer(size=None):
+    """Return the cached static field surface, rebuilt only when the requested size changes."""
+    global _FIELD_LAYER
+    size = tuple(size) if size else (WIDTH, HEIGHT)
+    if _FIELD_LAYER is None or _FIELD_LAYER.get_size() != size:
+        layer = _compose_field()
+        if layer.get_size() != size:
+            layer = pygame.transform.smoothscale(layer, size)
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()
+        _FIELD_LAYER = layer
+    return _FIELD_LAYER
+
+
+def invalidate_field_layer():
+    """Drop the cached field so it is recomposed on the next draw (e.g. after a scale change)."""
+    global _FIELD_LAYER
+    _FIELD_LAYER = None
+
+
+def draw_field(surface):
+    surface.blit(get_field_layer(surface.get_size()), (0, 0))
 
 
 def draw_hud(surface, p1, p2, phase, step_time_left, step_nr):
-    font = pygame.font.SysFont(None, 22)
+    font = get_font(22)
 
     def panel(player, x, align_left=True):
         y = 8
+        econ = player.ctx.econ
         # Compute worker bonus preview based on current workers
-        try:
-            from .config import WORKER_BONUS
-            bonus_pct = int((WORKER_BONUS - 1.0) * 100)
-        except Exception:
-            bonus_pct = 0
+        bonus_pct = int((econ['WORKER_BONUS'] - 1.0) * 100)
         s = [
             f"{player.name}",
             f"Workers: {player.workers}   Soldiers: {player.soldiers}",
-            f"Houses: {player.houses} (+{player.houses*HOUSE_WORKER_BONUS + BASE_WORKERS_PER_STEP}/step)",
+            f"Houses: {player.houses} (+{player.houses*econ['HOUSE_WORKER_BONUS'] + econ['BASE_WORKERS_PER_STEP']}/step)",
             f"Attack%: {int(player.attack_pct*100)}",
             f"Defenses: {player.defenses}",
             f"Worker Bonus: +{bonus_pct}% (~+{int(player.workers * bonus_pct/100)})",
@@ -538,7 +559,7 @@ def draw_hud(surface, p1, p2, phase, step_time_left, step_nr):
         for line in s:
             if not line:
                 continue
-            img = font.render(line, True, WHITE)
+            img = render_text(font, line, WHITE)
             if align_left:
                 surface.blit(img, (x, y)); y += 20
             else:
@@ -548,5 +569,5 @@ def draw_hud(surface, p1, p2, phase, step_time_left, step_nr):
     panel(p2, WIDTH-10, False)
 
     phase_text = f"Step {step_nr} — {phase}  {step_time_left:0.1f}s"
-    img = font.render(phase_text, True, WHITE)
+    img = render_text(font, phase_text, WHITE)
     surface.blit(img, (WIDTH//2 - img.get_width()//2, 8))
@@ -0,0 +1,320 @@
+"""
+Workers & War — headless N-player free-for-all engine (no pygame).
+
+Same rules as game_multi/run.py without any visuals, so it scales to large matches:
+attacks are split over the alive players in O(n) per step and the alive set is only
+rebuilt when someone is eliminated.
+
+  python -m game_multi.headless --players 64 --max-steps 300 --seed 1
+  python -m game_multi.headless --bots greedy_rush boom_econ turtle_defense adaptive_match
+  python -m game_multi.headless --players 8 --seed 3 --replay ffa.wwr
+  python -m game_multi.headless --bots king_bot turtle_defense --max-steps 20000 --bounded
+
+Differences from the windowed loop: every built tower is placed (no overlap rejection) and
+attacks are not capped by the number of soldier sprites standing in the garrison.
+"""
+
+import random, sys
+
+from game.config import HOUSE_COST, DEFENSE_COST, BOUNDED_COUNT_CAP, economy
+from game.model import PlayerCore, saturate
+from game.context import MatchContext
+from game.botcall import decide_all
+from game.combat import resolve_attack_packet
+from game.replay import HOUSES, DEFENSES, CONVERT, ATTACK, ELIMINATE_ALWAYS, ELIMINATE_ON_ATTACK, ReplayWriter, to_move, move_label
+
+ENGINE_VERSION = 2    # bump when the rules change (invalidates cached results)
+
+
+def sanitize_action(act_dict, prev_attack_pct, workers_available, house_cost=HOUSE_COST, defense_cost=DEFENSE_COST):
+    # Same one-action rule as 2P, with robust parsing and clamping
+    def to_int_nonneg(val):
+        try:
+            n = int(float(val))
+        except Exception:
+            n = 0
+        return max(0, n)
+
+    def to_float_01(val, default):
+        try:
+            f = float(val)
+        except Exception:
+            return default
+        return max(0.0, min(1.0, f))
+
+    convert = to_int_nonneg(act_dict.get("convert", 0))
+    build_h = to_int_nonneg(act_dict.get("build_houses", 0))
+    build_d = to_int_nonneg(act_dict.get("build_defenses", 0))
+    attack_raw = act_dict.get("attack_pct", None)
+    attack_pct = prev_attack_pct if attack_raw is None else to_float_01(attack_raw, prev_attack_pct)
+
+    if convert > 0:
+        amt = min(convert, workers_available)
+        return {"kind": "convert", "convert": amt, "attack_pct": prev_attack_pct}
+    if build_h > 0:
+        can_h = min(build_h, workers_available // house_cost)
+        return {"kind": "build_houses", "build_houses": can_h, "attack_pct": prev_attack_pct}
+    if build_d > 0:
+        can_d = min(build_d, workers_available // defense_cost)
+        return {"kind": "build_defenses", "build_defenses": can_d, "attack_pct": prev_attack_pct}
+    if attack_raw is not None and attack_pct > 0.0:
+        return {"kind": "attack", "attack_pct": attack_pct}
+    return {"kind": "none", "attack_pct": prev_attack_pct}
+
+
+def split_attacks(sends, alive):
+    """Incoming attackers per alive player when every sender splits evenly over the others.
+
+    sends: {player index: attackers sent}; alive: alive player indices in ascending order.
+    Each sender gives send // k to each of the k other alive players, and one extra to the
+    first send % k of them (in index order), as in game_multi/run.py. Returns {index: incoming}.
+    Runs in O(len(alive) + len(sends)): equal shares are summed once, and the extras are
+    contiguous runs over `alive`, added with a difference array.
+    """
+    k = len(alive) - 1
+    if k <= 0:
+        return {}
+    pos = {j: a for a, j in enumerate(alive)}
+    share_total = 0
+    own_share = {}
+    diff = [0] * (len(alive) + 1)
+    for i, send in sends.items():
+        if send <= 0 or i not in pos:
+            continue
+        per, rem = divmod(send, k)
+        share_total += per
+        own_share[i] = per
+        if rem:
+            # First `rem` alive players other than the sender
+            pi = pos[i]
+            end = rem if pi >= rem else rem + 1
+            diff[0] += 1
+            diff[end] -= 1
+            if pi < end:
+                diff[pi] -= 1
+                diff[pi + 1] += 1
+    incoming = {}
+    extra = 0
+    for a, j in enumerate(alive):
+        extra += diff[a]
+        n = share_total - own_share.get(j, 0) + extra
+        if n > 0:
+            incoming[j] = n
+    return incoming
+
+
+class FfaMatch:
+    """Headless free-for-all between any number of bots; call step() or run().
+    econ: economy constants for this match (game.config.economy(...)); defaults to game/config.py.
+    ctx: a game.context.MatchContext to play in (overrides seed/econ).
+    replay: a game.replay.ReplayWriter that records every step.
+    elimination: ELIMINATE_ALWAYS (this engine: checked every step, towers keep a player in) or
+      ELIMINATE_ON_ATTACK (the windowed 1v1, game/run.py: checked only on steps where someone sent
+      soldiers, and towers don't count); replays of 1v1 matches re-simulate with the latter.
+    """
+
+    def __init__(self, bots, names=None, seed=None, econ=None, ctx=None, replay=None, elimination=None):
+        assert len(bots) >= 2, "Need at least 2 players"
+        ctx = ctx or MatchContext(seed=seed, econ=econ)
+        if ctx.seed is not None:
+            # Bots that use the `random` module get a reproducible stream too
+            random.seed(ctx.seed)
+        names = names or unique_names(bots)
+        self._setup(ctx, bots, [PlayerCore(name, ctx) for name in names], replay, elimination)
+
+    @classmethod
+    def from_players(cls, players, ctx=None):
+        """A match without bots over existing PlayerCores (e.g. clones), driven with
+        spawn()/moves()/apply(); alive players are those not marked dead."""
+        m = cls.__new__(cls)
+        m._setup(ctx or players[0].ctx, [None] * len(players), list(players), None)
+        return m
+
+    def _setup(self, ctx, bots, players, replay, elimination=None):
+        self.ctx = ctx
+        self.econ = ctx.econ
+        self.bots = list(bots)
+        self.players = players
+        self.alive = [i for i, p in enumerate(players) if not p.dead]   # ascending player indices
+        self.eliminated = []                                             # (step, index) in elimination order
+        self.step_nr = 1
+        self.replay = replay
+        self.elimination = elimination or ELIMINATE_ALWAYS
+        if replay is not None:
+            replay.elimination = self.elimination   # re-simulated under the same rule
+
+    def done(self):
+        return len(self.alive) <= 1
+
+    def spawn(self):
+        """Economy phase: every alive player grows its workers."""
+        for i in self.alive:
+            self.players[i].spawn_workers()
+
+    def step(self):
+        """Play one step: economy, decisions, actions, combat, eliminations."""
+        players, n = self.players, len(self.players)
+        step_nr = self.step_nr
+        self.spawn()
+
+        # Everyone decides on the same state before any action applies, as in the windowed
+        # game; async bots decide concurrently (game.botcall)
+        alive = self.alive
+        # Same reference opponent as the windowed game: the next seat
+        views = [players[i].bot_view(step_nr, players[(i + 1) % n]) for i in alive]
+        decided = decide_all([self.bots[i] for i in alive], views)
+
+        for i, raw in zip(alive, decided):
+            if isinstance(raw, Exception):
+                print(f"[WARN] {players[i].name} bot error at step {step_nr}: {raw}")
+        self.apply(self.moves(decided))
+
+    def moves(self, actions):
+        """Moves {player index: (kind, amount, pct)} for raw bot actions, one per alive player in
+        order (an Exception or None counts as waiting)."""
+        players = self.players
+        house_cost, defense_cost = self.econ["HOUSE_COST"], self.econ["DEFENSE_COST"]
+        moves = {}
+        for i, raw in zip(self.alive, actions):
+            me = players[i]
+            if isinstance(raw, Exception) or not raw:
+                raw = {}
+            act = sanitize_action(raw, me.attack_pct, me.workers, house_cost, defense_cost)
+            send = int(me.soldiers * act["attack_pct"]) if act["kind"] == "attack" else 0
+            moves[i] = to_move(act, send)
+        return moves
+
+    def apply(self, moves):
+        """Actions, combat and eliminations for this step's moves {player index: (kind, amount, pct)}
+        (game.replay.to_move); step() decides them, replays read them from the file."""
+        players, econ = self.players, self.econ
+        house_cost, defense_cost, cap = econ["HOUSE_COST"], econ["DEFENSE_COST"], econ["COUNT_CAP"]
+        sends = {}
+        for i, move in moves.items():
+            me = players[i]
+            if me.dead:
+                continue
+            kind, n, pct = move
+            if kind == HOUSES:
+                me.houses = saturate(me.houses + n, cap); me.workers -= n*house_cost
+            elif kind == DEFENSES:
+                me.defenses += n; me.workers -= n*defense_cost
+                me.towers.extend({"hp": econ["DEFENSE_HEALTH"]} for _ in range(n))
+            elif kind == CONVERT:
+                me.soldiers = saturate(me.soldiers + n, cap); me.workers -= n
+            elif kind == ATTACK:
+                me.attack_pct = pct
+                me.soldiers -= n
+                sends[i] = n
+            me.last_action = move_label(move)
+
+        for j, incoming in split_attacks(sends, self.alive).items():
+            p = players[j]
+            p.towers, p.soldiers, p.workers, _, _, _, _ = \
+                resolve_attack_packet(incoming, p.towers, p.soldiers, p.workers)
+            p.defenses = len(p.towers)
+
+        if self.elimination == ELIMINATE_ON_ATTACK:
+            attacked = any(n > 0 for n in sends.values())
+            dead = [i for i in self.alive if players[i].workers <= 0 and players[i].soldiers <= 0] if attacked else []
+        else:
+            dead = [i for i in self.alive
+                    if players[i].workers <= 0 and players[i].soldiers <= 0 and not players[i].towers]
+        if dead:
+            for i in dead:
+                players[i].dead = True
+                self.eliminated.append((self.step_nr, i))
+            gone = set(dead)
+            self.alive = [i for i in self.alive if i not in gone]
+        if self.replay is not None:
+            self.replay.record(moves, players)
+        self.step_nr += 1
+
+    def run(self, max_steps=None):
+        """Play until one player (or nobody) is left, or max_steps steps. Returns the winner's name or None."""
+        while not self.done() and (max_steps is None or self.step_nr <= max_steps):
+            self.step()
+        return self.winner()
+
+    def winner(self):
+        return self.players[self.alive[0]].name if len(self.alive) == 1 else None
+
+    def standings(self):
+        """[(place, name, eliminated_at_step or None)]: survivors by population, then by elimination (latest first)."""
+        players = self.players
+        survivors = sorted(self.alive, key=lambda i: -(players[i].workers + players[i].soldiers))
+        rows = [(i, None) for i in survivors] + [(i, s) for s, i in reversed(self.eliminated)]
+        return [(place, players[i].name, s) for place, (i, s) in enumerate(rows, 1)]
+
+
+def project(me, opp, my_actions=(), opp_actions=(), steps=1):
+    """Play `me` against `opp` (PlayerCores, changed in place) for up to `steps` steps with these rules.
+
+    Starts at a bot's decision point: step 1 applies my_actions[0] and opp_actions[0] to the state
+    as it is (this step's workers already spawned); later steps spawn first. Missing actions wait.
+    Stops early once a side is eliminated. Returns the number of steps played.
+    """
+    m = FfaMatch.from_players([me, opp])
+    seqs = (my_actions, opp_actions)
+    for k in range(steps):
+        if m.done():
+            return k
+        if k:
+            m.spawn()
+        m.apply(m.moves([seqs[i][k] if k < len(seqs[i]) else None for i in m.alive]))
+    return steps
+
+
+def unique_names(bots):
+    """Bot function names, suffixed with #k where the same bot plays more than once."""
+    names = [getattr(b, "__name__", f"bot{i}") for i, b in enumerate(bots)]
+    counts = {}
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+    seen = {}
+    out = []
+    for name in names:
+        if counts[name] > 1:
+            seen[name] = seen.get(name, 0) + 1
+            name = f"{name}#{seen[name]}"
+        out.append(name)
+    return out
+
+
+def run_headless_multi(bots, max_steps=None, seed=None, econ=None):
+    """Run a headless free-for-all and return the last player standing's name, or None."""
+    return FfaMatch(bots, seed=seed, econ=econ).run(max_steps)
+
+
+def main(argv=None):
+    import argparse  # here, not at the top: workers import this module (benchmarks/startup.py)
+    ap = argparse.ArgumentParser(description="Headless N-player Workers & War free-for-all")
+    ap.add_argument("--bots", nargs="*", help="bot function names from game/bots.py (cycled to fill --players)")
+    ap.add_argument("--players", type=int, default=None, help="number of players (default: number of --bots)")
+    ap.add_argument("--max-steps", type=int, default=500, help="stop after this many steps (default 500)")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--replay", metavar="PATH", help="save a replay of the match (game/replay.py)")
+    ap.add_argument("--bounded", action="store_true",
+                    help=f"counts saturate at {BOUNDED_COUNT_CAP:.0e} (COUNT_CAP), so long matches run at a constant cost per step")
+    args = ap.parse_args(argv)
+
+    import game.bots as ww_bots
+    names = args.bots or ["greedy_rush", "boom_econ", "turtle_defense", "adaptive_match", "king_bot"]
+    roster = [getattr(ww_bots, name) for name in names]
+    n = args.players or len(roster)
+    bots = [roster[i % len(roster)] for i in range(n)]
+
+    replay = ReplayWriter(meta={"engine": "ww-ffa"}) if args.replay else None
+    econ = economy(COUNT_CAP=BOUNDED_COUNT_CAP) if args.bounded else None
+    match = FfaMatch(bots, seed=args.seed, econ=econ, replay=replay)
+    winner = match.run(args.max_steps)
+    if replay is not None:
+        replay.save(args.replay)
+    print(f"{n} players, {match.step_nr - 1} steps, winner: {winner or 'none'}")
+    for place, name, out_step in match.standings():
+        print(f"  {place:3d}. {name:<24} {'alive' if out_step is None else f'out @ step {out_step}'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
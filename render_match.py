@@ -0,0 +1,47 @@
+"""
+Render a match offline (no window, virtual clock) and stream raw RGB24 frames.
+
+Examples:
+  python render_match.py ww --bots adaptive_match king_bot --out final.rgb
+  python render_match.py multi --bots greedy_rush boom_econ turtle_defense --every 2 --out - \
+      | ffmpeg -f rawvideo -pix_fmt rgb24 -s 2048x1200 -r 30 -i - final.mp4
+  python render_match.py tron --out tron.rgb
+
+Frame size and rate are printed to stderr so the output can be fed to ffmpeg.
+"""
+
+import argparse, sys
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("game", choices=["ww", "multi", "tron"])
+    ap.add_argument("--bots", nargs="*", help="bot function names (game/bots.py for ww/multi, tron/main.py for tron)")
+    ap.add_argument("--out", default="-", help="output file, or '-' for stdout (default)")
+    ap.add_argument("--every", type=int, default=1, help="keep every Nth frame (default 1 = all)")
+    ap.add_argument("--max-steps", type=int, default=None, help="Workers & War: stop after this many steps")
+    args = ap.parse_args(argv)
+
+    if args.game == "tron":
+        import tron.main as tron
+        bots = [getattr(tron, name) for name in args.bots] if args.bots else tron.BOTS
+        size, fps = (tron.GRID_W * tron.CELL, tron.GRID_H * tron.CELL), tron.FPS
+        print(f"[render] {size[0]}x{size[1]} rgb24 @ {fps / max(1, args.every):g} fps", file=sys.stderr)
+        result = tron.run_match(bots, headless=True, frames=args.out, frame_every=args.every)
+    else:
+        import game.bots as ww_bots
+        from game.config import WIDTH, HEIGHT, FPS
+        names = args.bots or (["adaptive_match", "king_bot"] if args.game == "ww" else ["greedy_rush", "boom_econ", "turtle_defense", "adaptive_match"])
+        bots = [getattr(ww_bots, name) for name in names]
+        print(f"[render] {WIDTH}x{HEIGHT} rgb24 @ {FPS / max(1, args.every):g} fps", file=sys.stderr)
+        if args.game == "ww":
+            from game.run import run_game
+            result = run_game(bots[0], bots[1], headless=True, frames=args.out, frame_every=args.every, max_steps=args.max_steps)
+        else:
+            from game_multi.run import run_game_multi
+            result = run_game_multi(bots, headless=True, frames=args.out, frame_every=args.every, max_steps=args.max_steps)
+    print(f"[render] result: {result}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
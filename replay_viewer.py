@@ -0,0 +1,227 @@
+"""
+Workers & War replay viewer.
+
+Plays a replay (game/replay.py) on the usual field, bases and HUD (game/view.py) at any speed,
+from 1/4x to 32x real time (1x = one step per STEP_TIME, as in the live game).
+
+  python replay_viewer.py replays/adaptive_match-vs-king_bot-seed0.wwr
+  python replay_viewer.py final.wwr --speed 8 --start 200
+
+Keys: SPACE pause, LEFT/RIGHT one step (pauses), UP/DOWN faster/slower, PAGE UP/DOWN one
+keyframe back/forward, HOME/END first/last step, Q or ESC quit. Click or drag the bar at the
+bottom to scrub. Seeks restore the nearest keyframe, so jumping anywhere costs at most one
+keyframe interval of re-simulation.
+
+Attack volleys, conversions walking in and worker wander are only played at real time or
+slower; faster than that (and while scrubbing) the viewer draws each step's state directly.
+"""
+
+import argparse, sys
+
+import pygame
+from game.config import WIDTH, HEIGHT, FPS, STEP_TIME, TIME_SCALE
+from game.context import MatchContext
+from game.model import PlayerState
+from game.replay import Replay, ATTACK, CONVERT, WAIT_MOVE
+from game.view import draw_base, draw_hud, mark_dirty
+from game.anim import spawn_attack_units, AttackAnimation
+from game.render import DirtyRenderer
+from game.text import get_font, render_text
+
+SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16, 32)
+BAR_H = 10
+BAR_MARGIN = 40
+MAX_SPRITES = 1000    # per side and unit type; economies compound into the millions
+
+
+class ReplayViewer:
+    """Playback state of one 1v1 replay: position, speed and the two displayed players.
+    Drive it with handle(event), update(dt) and draw(surface) from any frame loop."""
+
+    def __init__(self, replay, speed=1, start=0):
+        if len(replay.names) != 2:
+            raise ValueError(f"the viewer shows 1v1 replays; this one has {len(replay.names)} players")
+        self.replay = replay
+        ctx = MatchContext(seed=replay.seed, econ=replay.econ)
+        self.players = (PlayerState(replay.names[0], "L", ctx), PlayerState(replay.names[1], "R", ctx))
+        self.speed_i = min(range(len(SPEEDS)), key=lambda i: abs(SPEEDS[i] - speed))
+        self.paused = False
+        self.dragging = False
+        self.pos = 0.0        # playback position in steps
+        self.shown = None     # step whose state the players show
+        self.t = 0.0          # playback clock for volleys (stops while paused)
+        self.volleys = []
+        self.bar = pygame.Rect(BAR_MARGIN, HEIGHT - BAR_H - 12, WIDTH - 2 * BAR_MARGIN, BAR_H)
+        self.seek(start)
+
+    @property
+    def speed(self):
+        return SPEEDS[self.speed_i]
+
+    def realtime(self):
+        """Play animations: at real time or slower and not scrubbing."""
+        return self.speed <= 1 and not self.dragging
+
+    # ----- playback -----
+    def seek(self, step):
+        step = max(0, min(int(step), self.replay.steps))
+        self.pos = float(step)
+        self._show(step)
+
+    def _show(self, step):
+        if step == self.shown:
+            return
+        animate = self.shown is not None and step == self.shown + 1 and self.realtime()
+        if not animate:
+            self.volleys.clear()
+        m = self.replay.match_at(step)
+        p1, p2 = self.players
+        if animate:
+            moves = self.replay.moves[step - 1]
+            (k1, n1, _), (k2, n2, _) = moves.get(0, WAIT_MOVE), moves.get(1, WAIT_MOVE)
+            for p, kind, n in ((p1, k1, n1), (p2, k2, n2)):
+                if kind == CONVERT:
+                    p.schedule_soldier_ingress(min(n, MAX_SPRITES))
+            send1 = n1 if k1 == ATTACK else 0
+            send2 = n2 if k2 == ATTACK else 0
+            units = (spawn_attack_units(p1, send1, p2, send2 > 0, p1.pop_attacking_soldiers(send1)) +
+                     spawn_attack_units(p2, send2, p1, send1 > 0, p2.pop_attacking_soldiers(send2)))
+            if units:
+                self.volleys.append(AttackAnimation(units, self.t))
+        for disp, p in zip(self.players, m.players):
+            sync_player(disp, p)
+        self.shown = step
+
+    def update(self, dt):
+        if not self.paused and not self.dragging:
+            self.t += dt * TIME_SCALE * self.speed
+            self.pos = min(float(self.replay.steps), self.pos + dt * TIME_SCALE * self.speed / STEP_TIME)
+            if self.pos >= self.replay.steps:
+                self.paused = True
+            target = int(self.pos)
+            if self.realtime():
+                # One step at a time, so each step's volley is launched
+                while self.shown < target:
+                    self._show(self.shown + 1)
+            else:
+                self._show(target)
+        self.volleys = [v for v in self.volleys if not v.done(self.t)]
+
+    # ----- input -----
+    def handle(self, event):
+        """Apply a key or mouse event; returns False when the viewer should close."""
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.KEYDOWN:
+            key, kf = event.key, self.replay.keyframe_every
+            if key in (pygame.K_q, pygame.K_ESCAPE):
+                return False
+            if key == pygame.K_SPACE:
+                if self.shown >= self.replay.steps:
+                    self.seek(0)
+                self.paused = not self.paused
+            elif key in (pygame.K_RIGHT, pygame.K_LEFT):
+                self.paused = True
+                self.seek(self.shown + (1 if key == pygame.K_RIGHT else -1))
+            elif key == pygame.K_UP:
+                self.speed_i = min(len(SPEEDS) - 1, self.speed_i + 1)
+            elif key == pygame.K_DOWN:
+                self.speed_i = max(0, self.speed_i - 1)
+            elif key == pygame.K_PAGEUP:
+                self.seek((self.shown - 1) // kf * kf)
+            elif key == pygame.K_PAGEDOWN:
+                self.seek((self.shown // kf + 1) * kf)
+            elif key == pygame.K_HOME:
+                self.seek(0)
+            elif key == pygame.K_END:
+                self.seek(self.replay.steps)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.bar.inflate(0, 16).collidepoint(event.pos):
+            self.dragging = True
+            self._scrub(event.pos[0])
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self._scrub(event.pos[0])
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+        return True
+
+    def _scrub(self, x):
+        self.seek(round((x - self.bar.x) / max(1, self.bar.w) * self.replay.steps))
+
+    # ----- drawing -----
+    def draw(self, surface, dt):
+        wander = self.realtime()
+        p1, p2 = self.players
+        draw_base(surface, p1, dt, wander, MAX_SPRITES)
+        draw_base(surface, p2, dt, wander, MAX_SPRITES)
+        for v in self.volleys:
+            v.update(self.t)
+            v.draw(surface, self.t)
+        if self.paused:
+            phase = "PAUSED"
+        else:
+            phase = f"REPLAY {self.speed:g}x"
+        draw_hud(surface, p1, p2, phase, 0.0, self.shown)
+        self._draw_bar(surface)
+
+    def _draw_bar(self, surface):
+        bar, steps = self.bar, max(1, self.replay.steps)
+        mark_dirty(surface, pygame.draw.rect(surface, (40, 40, 40), bar), 'bar')
+        done = bar.copy()
+        done.w = int(bar.w * self.shown / steps)
+        mark_dirty(surface, pygame.draw.rect(surface, (220, 180, 40), done), 'bar', done.w)
+        for k in self.replay.keyframes:
+            x = bar.x + int(bar.w * k / steps)
+            mark_dirty(surface, pygame.draw.line(surface, (240, 240, 240), (x, bar.y - 3), (x, bar.y - 1)), 'kf', x)
+        img = render_text(get_font(18), f"{self.shown}/{self.replay.steps}   {self.speed:g}x", (240, 240, 240))
+        surface.blit(img, (bar.right - img.get_width(), bar.y - img.get_height() - 4))
+
+
+def sync_player(disp, p):
+    """Copy a re-simulated player's counts onto a displayed one, keeping its sprite layout."""
+    disp.workers, disp.soldiers, disp.houses = p.workers, p.soldiers, p.houses
+    disp.attack_pct, disp.last_action = p.attack_pct, p.last_action
+    towers = disp.towers
+    hps = [t["hp"] for t in p.towers]
+    if len(towers) > len(hps):
+        # Combat destroys towers from the front of the list
+        del towers[:len(towers) - len(hps)]
+    elif len(towers) < len(hps):
+        disp.add_defenses(len(hps) - len(towers))
+    for t, hp in zip(towers, hps):
+        t["hp"] = hp
+    disp.defenses = len(towers)
+    # draw_base trims extra soldiers and lays out houses; missing garrison sprites are added here
+    have = len(disp._soldier_positions) + len(disp._soldier_incoming)
+    want = min(disp.soldiers, MAX_SPRITES)
+    if have < want:
+        disp.add_soldiers(want - have)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path", help="replay file (tournament.py --replays, FfaMatch/run_game replay=...)")
+    ap.add_argument("--speed", type=float, default=1, help=f"initial speed, one of {', '.join(f'{s:g}' for s in SPEEDS)} (default 1)")
+    ap.add_argument("--start", type=int, default=0, help="step to start at (default 0)")
+    args = ap.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Workers & War — replay: {' vs '.join(replay.names)}")
+    viewer = ReplayViewer(replay, args.speed, args.start)
+    renderer = DirtyRenderer(screen)
+    clock = viewer.players[0].ctx.clock
+    while True:
+        dt = clock.tick(FPS) / 1000.0
+        for event in pygame.event.get():
+            if not viewer.handle(event):
+                pygame.quit()
+                return 0
+        viewer.update(dt)
+        frame = renderer.begin()
+        viewer.draw(frame, dt)
+        renderer.present()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Economy parameter sweep for Workers & War.
+
+Runs the bot roster from game/bots.py round-robin (every pair, once per seed) under each
+config on a process pool, and prints one row per config as soon as it finishes: each bot's
+win rate, the draw rate and the mean game length in steps. Matches use the windowed 1v1's
+elimination rule (game.replay.ELIMINATE_ON_ATTACK). Configs travel with each match
+(game.config.economy), so workers can play different configs at the same time; a config whose
+matches raise is printed as a FAILED row and makes the exit status 1.
+
+Examples:
+  python sweep.py --grid HOUSE_COST=10,20,40 --grid DEFENSE_HEALTH=15,30,60
+  python sweep.py --random WORKER_BONUS=1.02:1.08 --random HOUSE_WORKER_BONUS=1:6 --samples 16 --seeds 4
+  python sweep.py --grid DEFENSE_COST=10,20,30 --bots greedy_rush turtle_defense --workers 4
+
+Parameters: BASE_WORKERS_PER_STEP, WORKER_BONUS, HOUSE_WORKER_BONUS, HOUSE_COST, DEFENSE_COST, DEFENSE_HEALTH, COUNT_CAP.
+Costs, DEFENSE_HEALTH and WORKER_BONUS must be positive, the rest non-negative.
+"""
+
+import argparse, itertools, random, sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from game.config import ECONOMY_KEYS, economy
+
+DEFAULT_BOTS = ["greedy_rush", "boom_econ", "turtle_defense", "adaptive_match", "king_bot"]
+
+
+def _number(text):
+    return float(text) if any(c in text for c in ".eE") else int(text)
+
+
+def _term(spec, sep, form):
+    """'KEY=...' -> (KEY, [numbers split on sep]); ValueError naming the spec if it isn't `form`."""
+    key, eq, values = spec.partition("=")
+    key = key.strip()
+    if not eq or not key:
+        raise ValueError(f"{spec!r}: expected {form}")
+    if key not in ECONOMY_KEYS:
+        raise ValueError(f"{spec!r}: not an economy constant (one of {', '.join(ECONOMY_KEYS)})")
+    parts = values.split(sep)
+    if not all(v.strip() for v in parts):
+        raise ValueError(f"{spec!r}: empty value, expected {form}")
+    try:
+        values = [_number(v.strip()) for v in parts]
+    except ValueError:
+        raise ValueError(f"{spec!r}: values must be numbers") from None
+    for v in values:
+        try:
+            economy(**{key: v})
+        except ValueError as e:
+            raise ValueError(f"{spec!r}: {e}") from None
+    return key, values
+
+
+def parse_grid(specs):
+    """['HOUSE_COST=10,20', ...] -> list of override dicts (cartesian product).
+    Raises ValueError for a malformed term or an unknown key."""
+    axes = []
+    for spec in specs:
+        key, values = _term(spec, ",", "KEY=v1,v2,...")
+        axes.append([(key, v) for v in values])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def parse_random(specs, samples, rng):
+    """['WORKER_BONUS=1.02:1.08', ...] -> `samples` override dicts drawn uniformly from the ranges.
+    Integer bounds draw integers. Raises ValueError for a malformed term or an unknown key."""
+    ranges = []
+    for spec in specs:
+        key, bounds = _term(spec, ":", "KEY=lo:hi")
+        if len(bounds) != 2:
+            raise ValueError(f"{spec!r}: expected KEY=lo:hi")
+        if bounds[0] > bounds[1]:
+            raise ValueError(f"{spec!r}: lo is above hi")
+        ranges.append((key, *bounds))
+    out = []
+    for _ in range(samples):
+        out.append({k: (rng.randint(lo, hi) if isinstance(lo, int) and isinstance(hi, int) else round(rng.uniform(lo, hi), 4))
+                    for k, lo, hi in ranges})
+    return out
+
+
+def play_config(overrides, bot_names, seeds, max_steps):
+    """Worker: round-robin under one config. Returns (overrides, wins per bot, draws, matches, total steps)."""
+    import game.bots as ww_bots
+    from game.replay import ELIMINATE_ON_ATTACK
+    from game_multi.headless import FfaMatch
+    econ = economy(**overrides)
+    bots = [getattr(ww_bots, name) for name in bot_names]
+    wins = [0] * len(bots)
+    draws = matches = steps = 0
+    for a, b in itertools.combinations(range(len(bots)), 2):
+        for seed in seeds:
+            # The windowed 1v1's elimination rule, so the rates describe the game run_game plays
+            m = FfaMatch([bots[a], bots[b]], seed=seed, econ=econ, elimination=ELIMINATE_ON_ATTACK)
+            m.run(max_steps)
+            matches += 1
+            steps += m.step_nr - 1
+            if len(m.alive) == 1:
+                wins[(a, b)[m.alive[0]]] += 1
+            else:
+                draws += 1
+    return overrides, wins, draws, matches, steps
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--grid", action="append", default=[], metavar="NAME=v1,v2,...", help="values to sweep (cartesian product)")
+    ap.add_argument("--random", action="append", default=[], metavar="NAME=lo:hi", help="uniform range to sample")
+    ap.add_argument("--samples", type=int, default=8, help="random configs to draw (with --random, default 8)")
+    ap.add_argument("--bots", nargs="*", default=DEFAULT_BOTS, help="bot function names from game/bots.py")
+    ap.add_argument("--seeds", type=int, default=2, help="matches per pairing and config (default 2)")
+    ap.add_argument("--max-steps", type=int, default=300, help="step limit per match (default 300)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--rng-seed", type=int, default=0, help="seed for drawing --random configs")
+    args = ap.parse_args(argv)
+
+    try:
+        configs = parse_grid(args.grid) if args.grid else [{}]
+        if args.random:
+            drawn = parse_random(args.random, args.samples, random.Random(args.rng_seed))
+            configs = [{**g, **r} for g in configs for r in drawn]
+    except ValueError as e:
+        ap.error(str(e))
+    for c in configs:
+        try:
+            economy(**c)
+        except ValueError as e:
+            ap.error(str(e))
+    keys = sorted({k for c in configs for k in c}, key=ECONOMY_KEYS.index)
+    widths = [max(8, len(k)) for k in keys]
+
+    short = [name[:10] for name in args.bots]
+    header = "  ".join([f"{k:>{w}}" for k, w in zip(keys, widths)] + [f"{s:>10}" for s in short] + [f"{'draw':>6}", f"{'steps':>7}"])
+    print(header)
+    print("-" * len(header))
+    seeds = list(range(args.seeds))
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(play_config, c, args.bots, seeds, args.max_steps): c for c in configs}
+        for fut in as_completed(futures):
+            cells = [f"{futures[fut].get(k, ''):>{w}}" for k, w in zip(keys, widths)]
+            try:
+                overrides, wins, draws, matches, steps = fut.result()
+            except Exception as e:
+                # One broken config is a failed row, not the end of the sweep
+                failed += 1
+                print("  ".join(cells + [f"FAILED {type(e).__name__}: {e}"]), flush=True)
+                continue
+            # Each bot plays (len(bots) - 1) * seeds matches
+            per_bot = max(1, (len(args.bots) - 1) * len(seeds))
+            cells += [f"{w / per_bot:>10.0%}" for w in wins]
+            cells += [f"{draws / max(1, matches):>6.0%}", f"{steps / max(1, matches):>7.1f}"]
+            print("  ".join(cells), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import game.bots as bots
+from game.model import BOT_VIEW_CODEC
+from game_multi.headless import FfaMatch
+
+
+def round_trip(view):
+    buf = bytearray(BOT_VIEW_CODEC.size)
+    BOT_VIEW_CODEC.pack(view, buf)
+    return BOT_VIEW_CODEC.unpack(buf)
+
+
+def test_codec_round_trip():
+    m = FfaMatch([bots.boom_econ, bots.greedy_rush], seed=1)
+    m.run(5)
+    view = m.players[0].bot_view(m.step_nr, m.players[1])
+    out = round_trip(view)
+    assert out.step == view.step
+    assert tuple(out.me) == (view.me.workers, view.me.soldiers, view.me.houses, view.me.defenses, view.me.attack_pct)
+    assert out.economy == view.economy and out.costs == view.costs
+
+
+def test_codec_saturates_unbounded_counts():
+    # COUNT_CAP = 0 lets counts outgrow int64; the bot sees the int64 maximum instead of the match dying
+    m = FfaMatch([bots.boom_econ, bots.greedy_rush], seed=1)
+    me = m.players[0]
+    me.workers = 3 ** 60
+    out = round_trip(me.bot_view(1, m.players[1]))
+    assert out.me.workers == 2 ** 63 - 1
+    assert me.workers == 3 ** 60
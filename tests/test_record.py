@@ -0,0 +1,17 @@
+import game.bots as bots
+import tron.main as tron
+from game.clock import get_clock
+from game.context import MatchContext
+from game.run import run_game
+from game_multi.run import run_game_multi
+
+
+def test_headless_runs_restore_the_clock():
+    clock = get_clock()
+    run_game(bots.greedy_rush, bots.boom_econ, headless=True, max_steps=5, fast_forward=True, ctx=MatchContext(seed=0))
+    assert get_clock() is clock
+    run_game_multi([bots.greedy_rush, bots.boom_econ, bots.king_bot], headless=True, max_steps=5,
+                   fast_forward=True, ctx=MatchContext(seed=0))
+    assert get_clock() is clock
+    tron.run_match(tron.BOTS[:2], headless=True, seed=0)
+    assert get_clock() is clock
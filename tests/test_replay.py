@@ -0,0 +1,65 @@
+import pytest
+
+import game.bots as bots
+import game.run as run
+from game.context import MatchContext
+from game.replay import Replay, ReplayWriter
+from game_multi.headless import FfaMatch
+
+
+def counts(players):
+    return [(p.workers, p.soldiers, p.houses, [t["hp"] for t in p.towers], p.attack_pct) for p in players]
+
+
+def record_1v1(monkeypatch, bot_l, bot_r, seed, max_steps=120, keyframe_every=10):
+    """Play a windowed 1v1 (headless) with a replay; returns (replay, counts after every step)."""
+    live = []
+    play_step = run.play_step
+
+    def snapshot(*args, **kwargs):
+        out = play_step(*args, **kwargs)
+        live.append(counts(args[2:4]))
+        return out
+
+    monkeypatch.setattr(run, "play_step", snapshot)
+    writer = ReplayWriter(keyframe_every=keyframe_every)
+    run.run_game(bot_l, bot_r, headless=True, max_steps=max_steps, fast_forward=True,
+                 ctx=MatchContext(seed=seed), replay=writer)
+    return Replay(writer.to_bytes()), live
+
+
+@pytest.mark.parametrize("bot_l, bot_r, seed", [
+    (bots.boom_econ, bots.greedy_rush, 3),
+    (bots.adaptive_match, bots.king_bot, 0),
+    (bots.greedy_rush, bots.turtle_defense, 1),
+])
+def test_1v1_replay_matches_every_step(monkeypatch, bot_l, bot_r, seed):
+    rp, live = record_1v1(monkeypatch, bot_l, bot_r, seed)
+    assert rp.steps == len(live)
+    for step in range(1, rp.steps + 1):
+        assert counts(rp.match_at(step).players) == live[step - 1], f"step {step}"
+    # Seeking backwards restores from keyframes
+    for step in range(rp.steps, 0, -7):
+        assert counts(rp.match_at(step).players) == live[step - 1], f"step {step}"
+
+
+def test_ffa_replay_matches_every_step():
+    roster = [bots.greedy_rush, bots.boom_econ, bots.turtle_defense, bots.adaptive_match, bots.king_bot]
+    writer = ReplayWriter(keyframe_every=25)
+    m = FfaMatch([roster[i % len(roster)] for i in range(8)], seed=3, replay=writer)
+    live = []
+    while not m.done() and m.step_nr <= 200:
+        m.step()
+        live.append(counts(m.players))
+    rp = Replay(writer.to_bytes())
+    for step in range(1, rp.steps + 1):
+        assert counts(rp.match_at(step).players) == live[step - 1], f"step {step}"
+
+
+def test_dead_players_moves_are_ignored():
+    m = FfaMatch([None, None, None], seed=0)
+    m.players[0].workers = 0
+    m.apply({})
+    assert m.players[0].dead and 0 not in m.alive
+    m.apply({0: (3, 5, 0.0)})   # CONVERT 5 from an eliminated player
+    assert (m.players[0].workers, m.players[0].soldiers) == (0, 0)
@@ -0,0 +1,33 @@
+import pytest
+
+import game.bots as bots
+from game.clock import set_clock
+from game.record import use_headless
+from replay_viewer import ReplayViewer
+
+from test_replay import counts, record_1v1
+
+
+@pytest.fixture
+def headless():
+    prev = use_headless()
+    yield
+    set_clock(prev)
+
+
+def test_viewer_shows_live_counts(monkeypatch, headless):
+    rp, live = record_1v1(monkeypatch, bots.boom_econ, bots.greedy_rush, seed=3)
+    viewer = ReplayViewer(rp)
+    for step in list(range(1, rp.steps + 1)) + [rp.steps // 2, 1, rp.steps]:
+        viewer.seek(step)
+        assert counts(viewer.players) == live[step - 1], f"step {step}"
+
+
+def test_viewer_playback_matches_seek(monkeypatch, headless):
+    rp, live = record_1v1(monkeypatch, bots.adaptive_match, bots.king_bot, seed=0, max_steps=60)
+    viewer = ReplayViewer(rp, speed=32)
+    while not viewer.paused:
+        viewer.update(1 / 60)
+        if viewer.shown:
+            assert counts(viewer.players) == live[viewer.shown - 1], f"step {viewer.shown}"
+    assert viewer.shown == rp.steps
@@ -0,0 +1,43 @@
+import types
+
+from game.results import bot_fingerprint
+
+
+def make_bot(source):
+    """A bot function `bot` defined in a fresh module from source."""
+    mod = types.ModuleType("fake_bots")
+    exec(compile(source, "fake_bots.py", "exec"), mod.__dict__)
+    return mod.bot
+
+
+BOT = """
+import math
+TABLE = {"open": 3, "late": [1, 2]}
+
+class Planner:
+    LIMIT = 5
+    def pick(self, n):
+        return min(n, self.LIMIT)
+
+def bot(state):
+    return {"build_houses": Planner().pick(TABLE["open"] + int(math.sqrt(state)))}
+"""
+
+
+def test_fingerprint_is_stable():
+    assert bot_fingerprint(make_bot(BOT)) == bot_fingerprint(make_bot(BOT))
+    # Comments and blank lines don't matter
+    assert bot_fingerprint(make_bot(BOT)) == bot_fingerprint(make_bot("# tuned\n" + BOT.replace("\n\n", "\n\n\n")))
+
+
+def test_fingerprint_sees_tables_classes_and_modules():
+    base = bot_fingerprint(make_bot(BOT))
+    edits = [
+        BOT.replace('"open": 3', '"open": 4'),            # dict table
+        BOT.replace("[1, 2]", "[1, 3]"),                   # list inside it
+        BOT.replace("LIMIT = 5", "LIMIT = 6"),             # class attribute
+        BOT.replace("min(n, self.LIMIT)", "max(n, self.LIMIT)"),   # method body
+        BOT.replace("math.sqrt", "math.log1p"),            # module attribute
+    ]
+    for src in edits:
+        assert bot_fingerprint(make_bot(src)) != base, src
@@ -0,0 +1,33 @@
+import pytest
+
+import game.bots as bots
+from game_multi.headless import FfaMatch
+
+
+def view_at(max_steps=5):
+    m = FfaMatch([bots.boom_econ, bots.greedy_rush], seed=1)
+    m.run(max_steps)
+    m.spawn()
+    return m.players[0].bot_view(m.step_nr, m.players[1])
+
+
+def test_simulate_caches_per_step():
+    view = view_at()
+    out = view.simulate({"convert": 5}, {"attack_pct": 0.5}, steps=3)
+    assert view.simulate({"convert": 5}, {"attack_pct": 0.5}, steps=3) is out
+
+
+def test_simulate_list_valued_action():
+    view = view_at()
+    # Unhashable values are computed uncached, sanitized like any bot action: no count, so a wait
+    out = view.simulate({"convert": [5]})
+    assert out == view.simulate(None)
+    assert view.simulate({"convert": [5]}) is not out
+    assert view.simulate([{"convert": [5]}, None], {"attack_pct": [1]}, steps=2) == view.simulate(None, None, steps=2)
+
+
+@pytest.mark.parametrize("action", ["build_house", 5, [{"convert": 1}, "attack"], iter([{"convert": 1}])])
+def test_simulate_rejects_malformed_actions(action):
+    view = view_at()
+    with pytest.raises(TypeError, match="my_action must be None, an action dict or a list"):
+        view.simulate(action)
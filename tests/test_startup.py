@@ -0,0 +1,20 @@
+import subprocess, sys
+
+import pytest
+
+from benchmarks.startup import BUDGET_MS, FORBIDDEN, MODULES, ROOT, forbidden, measure
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_cold_import_budget(module):
+    # Same check as `python -m benchmarks.startup`: best of 3 fresh `python -X importtime` runs
+    ms, times = measure(module, 3)
+    assert not forbidden(times), f"{module} imports {', '.join(forbidden(times))}"
+    assert ms <= BUDGET_MS, f"{module} took {ms:.1f} ms to import (budget {BUDGET_MS:g} ms)"
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_headless_modules_stay_out_of_sys_modules(module):
+    code = f"import sys, {module}; print(' '.join(m for m in {FORBIDDEN!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == []
@@ -0,0 +1,121 @@
+"""
+Round-robin tournament for TRON or Workers & War, with cached results.
+
+Every pairing is played once per seed. Results are stored by content (game/results.py), so
+after a student edits their bot only the pairings involving that bot are simulated again.
+
+Examples:
+  python tournament.py ww --seeds 5
+  python tournament.py tron --bots right_hand_rule left_hand_rule random_safe --seeds 3
+  python tournament.py ww --no-cache
+  python tournament.py ww --no-cache --replays replays/   # keep every match (python -m game.replay FILE)
+  python tournament.py tron --sandbox     # each bot in its own process; crashes and hangs lose the step
+
+Workers & War pairings use the headless engine (game_multi/headless.py); TRON runs headless
+matches of tron/main.py.
+"""
+
+import argparse, itertools, os, random, sys
+
+from game.results import ResultCache, match_key, config_fingerprint
+
+
+def ww_match(bot_a, bot_b, seed, max_steps, sandbox=False, replay_dir=None):
+    """Winner index (0/1) of a headless 1v1 under the windowed 1v1's elimination rule, or None for a
+    draw/time limit.
+    replay_dir: save the match's replay there (game/replay.py)."""
+    from game.replay import ELIMINATE_ON_ATTACK
+    from game_multi.headless import FfaMatch
+    if sandbox:
+        from game.sandbox import BotPool
+        from game.model import BOT_VIEW_CODEC
+        random.seed(seed)   # workers fork with a seeded `random`, as FfaMatch seeds it in-process
+        with BotPool([bot_a, bot_b], BOT_VIEW_CODEC) as pool:
+            return ww_match(*pool.bots, seed, max_steps, replay_dir=replay_dir)
+    replay = None
+    if replay_dir is not None:
+        from game.replay import ReplayWriter
+        replay = ReplayWriter(meta={"engine": "ww-ffa"})
+    m = FfaMatch([bot_a, bot_b], seed=seed, replay=replay, elimination=ELIMINATE_ON_ATTACK)
+    m.run(max_steps)
+    if replay is not None:
+        replay.save(os.path.join(replay_dir, f"{bot_a.__name__}-vs-{bot_b.__name__}-seed{seed}.wwr"))
+    return m.alive[0] if len(m.alive) == 1 else None
+
+
+def tron_match(bot_a, bot_b, seed, sandbox=False):
+    import tron.main as tron
+    survivors = tron.run_match([bot_a, bot_b], headless=True, seed=seed, sandbox=sandbox)
+    names = [bot_a.__name__, bot_b.__name__]
+    return names.index(survivors[0]) if len(survivors) == 1 else None
+
+
+def run_tournament(game, bots, seeds, cache=None, max_steps=300, sandbox=False, replay_dir=None):
+    """Play every pair of bots once per seed. Returns {bot name: [wins, draws, losses]}.
+    sandbox: run the bots out of process (game.sandbox).
+    replay_dir: Workers & War: save a replay of every simulated (not cached) match there."""
+    if game == "tron":
+        import tron.main as tron
+        engine = ("tron", tron.ENGINE_VERSION)
+        config = config_fingerprint(tron)
+    else:
+        import game.config
+        from game.replay import ELIMINATE_ON_ATTACK
+        from game_multi.headless import ENGINE_VERSION
+        engine = ("ww-headless", ENGINE_VERSION, ELIMINATE_ON_ATTACK, max_steps)
+        config = config_fingerprint(game.config)
+
+    table = {fn.__name__: [0, 0, 0] for fn in bots}
+    for a, b in itertools.combinations(bots, 2):
+        for seed in seeds:
+            if game == "tron":
+                play = lambda: tron_match(a, b, seed, sandbox)
+            else:
+                play = lambda: ww_match(a, b, seed, max_steps, sandbox, replay_dir)
+            if cache is not None:
+                winner = cache.run(match_key(engine, (a, b), config, seed), play)
+            else:
+                winner = play()
+            if winner is None:
+                table[a.__name__][1] += 1; table[b.__name__][1] += 1
+            else:
+                w, l = (a, b) if winner == 0 else (b, a)
+                table[w.__name__][0] += 1; table[l.__name__][2] += 1
+    return table
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("game", choices=["ww", "tron"])
+    ap.add_argument("--bots", nargs="*", help="bot function names (game/bots.py for ww, tron/main.py for tron)")
+    ap.add_argument("--seeds", type=int, default=3, help="matches per pairing, seeded 0..N-1 (default 3)")
+    ap.add_argument("--max-steps", type=int, default=300, help="Workers & War: step limit per match (default 300)")
+    ap.add_argument("--no-cache", action="store_true", help="always re-simulate; don't read or write cached results")
+    ap.add_argument("--sandbox", action="store_true", help="run each bot in its own worker process (game/sandbox.py)")
+    ap.add_argument("--replays", metavar="DIR", help="Workers & War: save a replay of every simulated match in DIR "
+                                                    "(cached pairings are not replayed; add --no-cache for all)")
+    args = ap.parse_args(argv)
+    if args.replays:
+        os.makedirs(args.replays, exist_ok=True)
+
+    if args.game == "tron":
+        import tron.main as tron
+        bots = [getattr(tron, name) for name in args.bots] if args.bots else tron.BOTS
+    else:
+        import game.bots as ww_bots
+        names = args.bots or ["greedy_rush", "boom_econ", "turtle_defense", "adaptive_match", "king_bot"]
+        bots = [getattr(ww_bots, name) for name in names]
+
+    cache = None if args.no_cache else ResultCache()
+    table = run_tournament(args.game, bots, range(args.seeds), cache, args.max_steps, args.sandbox, args.replays)
+
+    print(f"{'bot':<24} {'W':>4} {'D':>4} {'L':>4}")
+    for name, (w, d, l) in sorted(table.items(), key=lambda kv: (-kv[1][0], kv[1][2])):
+        print(f"{name:<24} {w:4d} {d:4d} {l:4d}")
+    if cache is not None:
+        print(f"[cache] {cache.hits} cached, {cache.misses} simulated", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
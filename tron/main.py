@@ -3,9 +3,19 @@
 # - Add their functions to BOTS; the function names become player names
 # - Run: uv run tron/main.py
 
-import sys, math, random
+import os, sys, math, random, struct
 import pygame
 
+# Allow `python tron/main.py` to reach the shared helpers in the repo's `game` package
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from game.text import get_font, render_text, clear_text_cache
+from game.clock import get_clock
+from game.perf import get_profiler
+from game.record import FrameRecorder, use_headless, restores_clock
+from game.botcall import decide_all
+
 # ========== CONFIG ==========
 GRID_W, GRID_H = 49, 49          # odd numbers keep a single center cell
 CELL = 14                         # pixels per grid cell
@@ -13,6 +23,7 @@ FPS = 30                          # visual framerate (logic runs 1 step/frame)
 TICKS_MAX = 5000                  # safety cap
 WALL_MARGIN = 2                   # spawn in from walls
 SEED = None                       # set to an int for reproducibility
+ENGINE_VERSION = 1                # bump when the rules change (invalidates cached results)
 
 # player colors (cycled)
 PLAYER_COLORS = [
@@ -59,6 +70,35 @@ class BotState:
         self.bounds = (0, GRID_W-1, 0, GRID_H-1)
         self.sensors = sensors
 
+class _StateCodec:
+    """Fixed binary layout of a BotState, for bots running out of process (game.sandbox)."""
+    _head = struct.Struct("<hhhbh???h")   # me_index, x, y, heading, alive_count, left/ahead/right free, len(others)
+    _other = struct.Struct("<hh?")        # x, y, alive
+    size = _head.size + _other.size * len(PLAYER_COLORS)
+
+    def pack(self, st, buf):
+        s = st.sensors
+        self._head.pack_into(buf, 0, st.me_index, st.pos[0], st.pos[1], DIRS.index(st.heading), st.alive_count,
+                             s["left_free"], s["ahead_free"], s["right_free"], len(st.others))
+        off = self._head.size
+        for (x, y), a in st.others:
+            self._other.pack_into(buf, off, x, y, a)
+            off += self._other.size
+
+    def unpack(self, buf):
+        me, x, y, h, alive_count, left, ahead, right, n = self._head.unpack_from(buf, 0)
+        off = self._head.size
+        others = []
+        for _ in range(n):
+            ox, oy, a = self._other.unpack_from(buf, off)
+            others.append(((ox, oy), a))
+            off += self._other.size
+        sensors = {"left_free": left, "ahead_free": ahead, "right_free": right}
+        return BotState(me, (x, y), DIRS[h], alive_count, others, sensors)
+
+
+STATE_CODEC = _StateCodec()
+
 # ========== SENSOR COMPUTATION ==========
 def compute_sensors(heading, pos, occupied):
     gx, gy = pos
@@ -115,20 +155,38 @@ def draw_snakes(surface, heads, colors):
 
 def draw_hud(hud_surface, names, alive):
     hud_surface.fill((0,0,0,0))  # transparent
-    font = pygame.font.SysFont(None, 20)
+    font = get_font(20)
     y = 6
     for i, name in enumerate(names):
         label = f"{name} {' ' if alive[i] else '✖'}"
         color = PLAYER_COLORS[i % len(PLAYER_COLORS)]
         pygame.draw.rect(hud_surface, color, pygame.Rect(8, y+2, 10, 10))
-        img = font.render(label, True, (220,220,230))
+        img = render_text(font, label, (220,220,230))
         hud_surface.blit(img, (24, y))
         y += 18
 
 # ========== GAME LOOP ==========
-def run_match(bot_functions):
-    if SEED is not None:
-        random.seed(SEED)
+@restores_clock
+def run_match(bot_functions, headless=False, frames=None, frame_every=1, seed=None, sandbox=False):
+    """Play a match in a window.
+    headless: SDL dummy driver + virtual clock; runs as fast as possible and returns instead of
+      waiting for the window to close.
+    frames: path, '-' (stdout) or binary file receiving every `frame_every`-th frame as raw RGB24.
+    Press P to toggle the frame-time profiler overlay (game.perf).
+    seed: seeds `random` for this match (default: SEED).
+    sandbox: run each bot in its own worker process (game.sandbox); a bot that crashes or
+      takes longer than BOT_TIMEOUT goes straight ("S") and its worker is restarted.
+    Returns the names of the surviving bots (one name = winner).
+    """
+    seed = SEED if seed is None else seed
+    if seed is not None:
+        random.seed(seed)
+    if sandbox:
+        from game.sandbox import BotPool
+        with BotPool(bot_functions, STATE_CODEC) as pool:
+            return run_match(pool.bots, headless, frames, frame_every, seed)
+    if headless:
+        use_headless()
 
     n = len(bot_functions)
     assert 2 <= n <= len(PLAYER_COLORS), f"Need 2..{len(PLAYER_COLORS)} bots"
@@ -140,7 +198,9 @@ def run_match(bot_functions):
     W, H = GRID_W * CELL, GRID_H * CELL
     screen = pygame.display.set_mode((W, H))
     pygame.display.set_caption("TRON — Pygame")
-    clock = pygame.time.Clock()
+    clock = get_clock()
+    recorder = FrameRecorder(frames, frame_every) if frames is not None else None
+    prof = get_profiler()
 
     # board/trails
     occupied = {}    # (x,y) -> owner index
@@ -168,22 +228,25 @@ def run_match(bot_functions):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit(0)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                prof.toggle()
 
         # ----- decisions (all see same board) -----
         decisions = [None]*n
-        for i, bot in enumerate(bot_functions):
-            if not alive[i]: continue
-            sensors = compute_sensors(heading[i], heads[i], occupied)
-            others = [(heads[j], alive[j]) for j in range(n)]
-            state = BotState(i, heads[i], heading[i], sum(alive), others, sensors)
-            try:
-                mv = bot(state)
-            except Exception:
+        live = [i for i in range(n) if alive[i]]
+        others = [(heads[j], alive[j]) for j in range(n)]
+        states = [BotState(i, heads[i], heading[i], len(live), list(others), compute_sensors(heading[i], heads[i], occupied))
+                  for i in live]
+        with prof.phase("bots"):
+            moves = decide_all([bot_functions[i] for i in live], states)
+        for i, mv in zip(live, moves):
+            if not isinstance(mv, str):   # None, an exception or a missed deadline
                 mv = "S"
             mv = (mv or "S").upper().strip()[:1]
             decisions[i] = mv if mv in ("L","R","S") else "S"
 
         # ----- plan moves -----
+        prof.push("sim")
         next_head = [None]*n
         next_pos = [None]*n
         cell_targets = {}  # (x,y) -> [i,...] who try to enter
@@ -221,14 +284,24 @@ def run_match(bot_functions):
             heads[i] = next_pos[i]
             heading[i] = next_head[i]
             occupied[heads[i]] = i
+        prof.pop()
 
         # ----- draw -----
-        draw_board(screen, occupied, colors)
-        draw_snakes(screen, heads, colors)
-        draw_hud(hud, names, alive)
-        screen.blit(hud, (0,0))
-        pygame.display.flip()
-        clock.tick(FPS)
+        with prof.phase("field"):
+            draw_board(screen, occupied, colors)
+        with prof.phase("bases"):
+            draw_snakes(screen, heads, colors)
+        with prof.phase("hud"):
+            draw_hud(hud, names, alive)
+            screen.blit(hud, (0,0))
+            prof.draw_overlay(screen)
+        with prof.phase("flip"):
+            pygame.display.flip()
+            if recorder is not None:
+                recorder.capture(screen)
+        with prof.phase("wait"):
+            clock.tick(FPS)
+        prof.end_frame()
 
     # result
     winner_indices = [i for i, a in enumerate(alive) if a]
@@ -237,7 +310,7 @@ def run_match(bot_functions):
     draw_snakes(screen, heads, colors)
     draw_hud(hud, names, alive)
     screen.blit(hud, (0,0))
-    font = pygame.font.SysFont(None, 36)
+    font = get_font(36)
     if len(winner_indices) == 1:
         txt = f"WINNER: {names[winner_indices[0]]}"
     else:
@@ -245,6 +318,14 @@ def run_match(bot_functions):
     img = font.render(txt, True, (240,240,255))
     screen.blit(img, (20, 10))
     pygame.display.flip()
+    if recorder is not None:
+        for _ in range(2 * FPS):
+            recorder.capture(screen)
+        recorder.close()
+    if headless:
+        pygame.quit()
+        clear_text_cache()
+        return [names[i] for i in winner_indices]
 
     # keep window until closed
     while True:
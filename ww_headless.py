@@ -59,13 +59,25 @@ HOUSE_COST = 20
 DEFENSE_COST = 20
 DEFENSE_HEALTH = 30
 
+# Counts (workers, soldiers, houses) saturate at COUNT_CAP; 0 = exact, unbounded integers.
+# Workers compound by WORKER_BONUS, so matches thousands of steps long otherwise grow them
+# into huge integers (and past ~14,000 steps int(workers * 0.05) overflows a float).
+# run_text_sim(..., bounded=True) plays with BOUNDED_COUNT_CAP, which fits a signed 64-bit int.
+COUNT_CAP = 0
+BOUNDED_COUNT_CAP = 10**18
+
 
 # ================== HELPERS ==================
 
-def spawn_workers(p: Player) -> int:
+def saturate(n: int, cap: int) -> int:
+    """n, or cap when a cap is set and n is past it."""
+    return cap if cap and n > cap else n
+
+
+def spawn_workers(p: Player, cap: int = 0) -> int:
     bonus = int(p.workers * max(0.0, WORKER_BONUS - 1.0))
     before = p.workers
-    p.workers += BASE_WORKERS_PER_STEP + p.houses * HOUSE_WORKER_BONUS + bonus
+    p.workers = saturate(p.workers + BASE_WORKERS_PER_STEP + p.houses * HOUSE_WORKER_BONUS + bonus, cap)
     return p.workers - before
 
 
@@ -160,9 +172,14 @@ def view_for(step: int, me: Player, opp: Player) -> BotView:
 
 # ================== SIMULATOR ==================
 
-def run_text_sim(bot_L: Callable[[BotView], Dict], bot_R: Callable[[BotView], Dict], *, steps: int = 200, seed: int | None = None) -> None:
+def run_text_sim(bot_L: Callable[[BotView], Dict], bot_R: Callable[[BotView], Dict], *, steps: int = 200, seed: int | None = None,
+                 bounded: bool = False) -> None:
+    """Play and print a match. bounded: counts saturate at BOUNDED_COUNT_CAP (instead of COUNT_CAP),
+    so long matches cost the same per step; the time-limit score then compares saturated counts,
+    and two sides at the cap draw."""
     if seed is not None:
         random.seed(seed)
+    cap = BOUNDED_COUNT_CAP if bounded else COUNT_CAP
 
     L = Player(getattr(bot_L, "__name__", "LeftBot"))
     R = Player(getattr(bot_R, "__name__", "RightBot"))
@@ -172,8 +189,8 @@ def run_text_sim(bot_L: Callable[[BotView], Dict], bot_R: Callable[[BotView], Di
 
     for step in range(1, steps + 1):
         # Economy
-        spawn_workers(L)
-        spawn_workers(R)
+        spawn_workers(L, cap)
+        spawn_workers(R, cap)
 
         # Decisions (robust)
         try:
@@ -197,7 +214,7 @@ def run_text_sim(bot_L: Callable[[BotView], Dict], bot_R: Callable[[BotView], Di
 
         if aL["kind"] == "build_houses" and aL["build_houses"] > 0:
             n = aL["build_houses"]
-            L.houses += n; L.workers -= n * HOUSE_COST
+            L.houses = saturate(L.houses + n, cap); L.workers -= n * HOUSE_COST
             action_str_L = f"Build Houses x{n}"
         elif aL["kind"] == "build_defenses" and aL["build_defenses"] > 0:
             n = aL["build_defenses"]
@@ -206,7 +223,7 @@ def run_text_sim(bot_L: Callable[[BotView], Dict], bot_R: Callable[[BotView], Di
             action_str_L = f"Build Defenses x{n}"
         elif aL["kind"] == "convert" and aL.get("convert", 0) > 0:
             n = aL["convert"]
-            L.soldiers += n; L.workers -= n
+            L.soldiers = saturate(L.soldiers + n, cap); L.workers -= n
             action_str_L = f"Convert {n}"
         elif aL["kind"] == "attack":
             L.attack_pct = aL["attack_pct"]
@@ -216,7 +233,7 @@ def run_text_sim(bot_L: Callable[[BotView], Dict], bot_R: Callable[[BotView], Di
 
         if aR["kind"] == "build_houses" and aR["build_houses"] > 0:
             n = aR["build_houses"]
-            R.houses += n; R.workers -= n * HOUSE_COST
+            R.houses = saturate(R.houses + n, cap); R.workers -= n * HOUSE_COST
             action_str_R = f"Build Houses x{n}"
         elif aR["kind"] == "build_defenses" and aR["build_defenses"] > 0:
             n = aR["build_defenses"]
@@ -225,7 +242,7 @@ def run_text_sim(bot_L: Callable[[BotView], Dict], bot_R: Callable[[BotView], Di
             action_str_R = f"Build Defenses x{n}"
         elif aR["kind"] == "convert" and aR.get("convert", 0) > 0:
             n = aR["convert"]
-            R.soldiers += n; R.workers -= n
+            R.soldiers = saturate(R.soldiers + n, cap); R.workers -= n
             action_str_R = f"Convert {n}"
         elif aR["kind"] == "attack":
             R.attack_pct = aR["attack_pct"]